@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+"""
+Re-dispatches the review workflow for many extensions at once.
+
+The trigger-review action dispatches one sanitize-and-analyze.yml run per
+submission. When the review tooling or the Burp extension API changes, the
+whole catalog needs re-reviewing; this script sends the same
+workflow_dispatch request for each extension in a list, with bounded
+concurrency, a minimum interval between requests, and back-off when GitHub
+reports that the dispatch rate limit has been hit.
+
+Progress is checkpointed to a file after each accepted dispatch, so an
+interrupted run can be resumed without dispatching any extension twice.
+A dispatch that was sent but got no response (it timed out, or the
+connection dropped) may still have been accepted by GitHub. It is counted
+as unknown and checkpointed too, so a resumed run does not dispatch it
+again; check the review repository's runs for those extensions and
+re-dispatch any that are missing by hand.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib import request, error
+
+from github_actions_utils import profiled, set_output, write_step_summary
+
+
+GITHUB_API_URL = 'https://api.github.com'
+
+OWNER = 'PortSwigger'
+REPO = 'extension-portal-internal'
+WORKFLOW_FILE = 'sanitize-and-analyze.yml'
+REF = 'main'
+
+DEFAULT_CONCURRENCY = 4
+
+# Minimum seconds between the start of consecutive dispatches.
+DEFAULT_MIN_INTERVAL = 1.0
+
+# Times a throttled dispatch is retried before it is reported as throttled.
+MAX_THROTTLE_RETRIES = 3
+
+# Seconds to pause when GitHub throttles without saying for how long.
+DEFAULT_RETRY_AFTER = 60
+
+# Seconds a single dispatch request may take.
+DISPATCH_TIMEOUT = 30
+
+
+def build_dispatch_payload(extension, ref=REF):
+    """Build the workflow_dispatch body the trigger-review action sends for an extension."""
+    return {
+        'ref': ref,
+        'inputs': {
+            'extension_name': extension['extension_name'],
+            'target_repo_url': extension['target_repo_url'],
+            'compatible_products': extension.get('compatible_products', ''),
+            'jira_ticket': extension['jira_ticket'],
+            'issue_url': extension.get('issue_url', ''),
+            'is_update': extension.get('is_update', 'false'),
+        },
+    }
+
+
+def retry_after(headers, now):
+    """Return the seconds to wait before retrying a throttled request, from its headers."""
+    value = headers.get('Retry-After')
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+    if headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset'):
+        return max(0.0, float(headers['X-RateLimit-Reset']) - now)
+    return DEFAULT_RETRY_AFTER
+
+
+class Pacer:
+    """
+    Spaces request starts at least min_interval apart, across threads.
+
+    A waiting thread claims its start only once the clock has reached the
+    next free start time, so a pause() taken while it sleeps still holds it
+    back.
+    """
+
+    def __init__(self, min_interval, clock=time.monotonic, sleep=time.sleep):
+        self.min_interval = min_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                if now >= self._next_start:
+                    self._next_start = now + self.min_interval
+                    return
+                delay = self._next_start - now
+            self.sleep(delay)
+
+    def pause(self, seconds):
+        """Hold back every request until `seconds` from now."""
+        with self._lock:
+            self._next_start = max(self._next_start, self.clock() + seconds)
+
+
+class Checkpoint:
+    """Jira keys of extensions already dispatched, appended to a file one per line."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.strip() for line in f if line.strip()}
+
+    def record(self, key):
+        with self._lock:
+            self.done.add(key)
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(f'{key}\n')
+
+
+class DispatchUnknown(ValueError):
+    """A dispatch was sent but no response arrived, so it may have been accepted."""
+
+
+def dispatch(extension, github_token, api_url=GITHUB_API_URL, timeout=DISPATCH_TIMEOUT):
+    """
+    Send one workflow_dispatch request for an extension.
+
+    Returns:
+        float or None: None if the dispatch was accepted, otherwise the
+            seconds to wait before retrying a throttled request
+
+    Raises:
+        DispatchUnknown: If the request was sent but no response arrived
+            within the timeout
+        ValueError: If the dispatch was rejected for any other reason, or
+            could not be sent
+    """
+    req = request.Request(
+        f"{api_url}/repos/{OWNER}/{REPO}/actions/workflows/{WORKFLOW_FILE}/dispatches",
+        method='POST',
+        data=json.dumps(build_dispatch_payload(extension)).encode(),
+        headers={
+            'Accept': 'application/vnd.github+json',
+            'Authorization': f'Bearer {github_token}',
+            'Content-Type': 'application/json',
+        },
+    )
+
+    try:
+        with request.urlopen(req, timeout=timeout) as response:
+            response.read()
+        return None
+    except error.HTTPError as e:
+        throttled = e.code == 429 or (
+            e.code == 403 and (e.headers.get('Retry-After') or e.headers.get('X-RateLimit-Remaining') == '0')
+        )
+        if throttled:
+            return retry_after(e.headers, time.time())
+        raise ValueError(f"GitHub API error: {e.code} {e.reason}")
+    except error.URLError as e:
+        # urllib raises URLError only while connecting and sending.
+        raise ValueError(f"GitHub API request failed: {e.reason}")
+    except OSError as e:
+        raise DispatchUnknown(f"No response from GitHub API, the dispatch may have been accepted: {e}")
+
+
+def bulk_dispatch(extensions, github_token, checkpoint=None, concurrency=DEFAULT_CONCURRENCY,
+                  pacer=None, api_url=GITHUB_API_URL):
+    """
+    Dispatch the review workflow for every extension not already checkpointed.
+
+    Args:
+        extensions: List of dicts with extension_name, target_repo_url,
+            compatible_products and jira_ticket (issue_url and is_update optional)
+        github_token: Token allowed to dispatch workflows in the review repository
+        checkpoint: Checkpoint of already-dispatched Jira keys
+        concurrency: Maximum dispatches in flight at once
+        pacer: Pacer spacing request starts
+
+    Returns:
+        dict: Counts of accepted, failed, throttled, unknown and skipped
+            extensions
+    """
+    checkpoint = checkpoint or Checkpoint()
+    pacer = pacer or Pacer(DEFAULT_MIN_INTERVAL)
+    counts = {'accepted': 0, 'failed': 0, 'throttled': 0, 'unknown': 0, 'skipped': 0}
+    lock = threading.Lock()
+
+    def count(outcome):
+        with lock:
+            counts[outcome] += 1
+
+    def run(extension):
+        key = extension['jira_ticket']
+        for _ in range(MAX_THROTTLE_RETRIES + 1):
+            pacer.wait()
+            try:
+                wait = dispatch(extension, github_token, api_url)
+            except DispatchUnknown as e:
+                # Not retried, and not retried on resume: it may already be running.
+                print(f"::warning::Dispatch for {key} may have been accepted, check before re-dispatching: {e}",
+                      file=sys.stderr)
+                checkpoint.record(key)
+                count('unknown')
+                return
+            except Exception as e:
+                print(f"::warning::Dispatch failed for {key}: {e}", file=sys.stderr)
+                count('failed')
+                return
+            if wait is None:
+                checkpoint.record(key)
+                print(f"Dispatched review for {key} ({extension['extension_name']})")
+                count('accepted')
+                return
+            print(f"Throttled dispatching {key}; pausing {wait:.0f}s", file=sys.stderr)
+            pacer.pause(wait)
+        count('throttled')
+
+    pending = []
+    for extension in extensions:
+        if extension['jira_ticket'] in checkpoint.done:
+            counts['skipped'] += 1
+        else:
+            pending.append(extension)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, pending))
+
+    return counts
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    extensions_file = os.environ.get('EXTENSIONS_FILE')
+    github_token = os.environ.get('GH_TOKEN')
+
+    if not extensions_file or not github_token:
+        error_msg = 'EXTENSIONS_FILE and GH_TOKEN environment variables are required'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        with open(extensions_file) as f:
+            extensions = json.load(f)
+
+        counts = bulk_dispatch(
+            extensions,
+            github_token,
+            checkpoint=Checkpoint(os.environ.get('CHECKPOINT_FILE') or None),
+            concurrency=int(os.environ.get('CONCURRENCY') or DEFAULT_CONCURRENCY),
+            pacer=Pacer(float(os.environ.get('MIN_INTERVAL') or DEFAULT_MIN_INTERVAL)),
+        )
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    for outcome, value in counts.items():
+        set_output(outcome, value)
+    rows = '\n'.join(f'| {outcome} | {value} |' for outcome, value in counts.items())
+    write_step_summary(f'| Outcome | Extensions |\n| --- | ---: |\n{rows}')
+
+    if counts['failed'] or counts['throttled'] or counts['unknown']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    profiled(main)()
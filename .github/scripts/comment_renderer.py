@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+"""
+Renders and posts issue comments from the shared comment templates.
+
+comment-templates.json is loaded once and each template is compiled into a
+render function, with its placeholders validated up front. Rendering follows
+common-post-issue-comment.yml: template lines are joined with newlines,
+{{NAME}} placeholders are replaced by their values, and ERROR_MESSAGE is
+markdown-escaped because it can contain user-influenced text.
+
+Posting from the job that produced the outcome avoids starting a separate
+comment job, and several comments can be posted in one call.
+"""
+
+import functools
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from urllib import request, error
+
+from github_actions_utils import profiled, set_output
+
+
+GITHUB_API_URL = 'https://api.github.com'
+
+TEMPLATES_PATH = Path(__file__).parent.parent / 'resources' / 'comment-templates.json'
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+# Placeholders templates may use, and those whose values must be escaped.
+KNOWN_PLACEHOLDERS = {'ERROR_MESSAGE'}
+ESCAPED_PLACEHOLDERS = {'ERROR_MESSAGE'}
+
+MARKDOWN_SPECIAL = re.compile(r'[*_`\[\]]')
+
+# Seconds to wait for GitHub to answer a comment POST.
+POST_TIMEOUT = 30
+
+
+def escape_markdown(text):
+    """Escape markdown special characters, as escapeMarkdown does in the comment workflow."""
+    return MARKDOWN_SPECIAL.sub(lambda m: f'\\{m.group(0)}', text.replace('\\', '\\\\'))
+
+
+def compile_template(template_key, lines):
+    """
+    Compile template lines into a render function taking placeholder values.
+
+    Raises:
+        ValueError: If the template uses an unknown placeholder
+    """
+    # re.split with one group alternates literal text and placeholder names.
+    parts = PLACEHOLDER_PATTERN.split('\n'.join(lines))
+    literals = parts[0::2]
+    names = parts[1::2]
+
+    unknown = sorted(set(names) - KNOWN_PLACEHOLDERS)
+    if unknown:
+        raise ValueError(f"Template {template_key} uses unknown placeholders: {', '.join(unknown)}")
+
+    escaped = [name in ESCAPED_PLACEHOLDERS for name in names]
+
+    def render(values):
+        pieces = [literals[0]]
+        for name, escape, literal in zip(names, escaped, literals[1:]):
+            value = values.get(name) or ''
+            pieces.append(escape_markdown(value) if escape else value)
+            pieces.append(literal)
+        return ''.join(pieces)
+
+    return render
+
+
+@functools.lru_cache(maxsize=None)
+def load_renderers(path=TEMPLATES_PATH):
+    """Load the templates file and compile every template, keyed "category.type"."""
+    with open(path, encoding='utf-8') as f:
+        templates = json.load(f)
+    return {
+        f'{category}.{name}': compile_template(f'{category}.{name}', lines)
+        for category, entries in templates.items()
+        for name, lines in entries.items()
+    }
+
+
+def render(template_key, values=None, path=TEMPLATES_PATH):
+    """
+    Render a comment body from a template.
+
+    Args:
+        template_key: Template key, e.g. "extension-submission.success"
+        values: Placeholder values, e.g. {'ERROR_MESSAGE': '...'}
+
+    Raises:
+        ValueError: If the template does not exist
+    """
+    renderer = load_renderers(path).get(template_key)
+    if renderer is None:
+        raise ValueError(f"Template not found: {template_key}")
+    return renderer(values or {})
+
+
+def post_comment(repository, issue_number, body, github_token, api_url=GITHUB_API_URL, timeout=POST_TIMEOUT):
+    """
+    Post a comment to an issue and return the created comment's html_url.
+
+    Raises:
+        ValueError: If the comment was rejected or could not be sent, or no
+            response arrived within the timeout (the comment may then have
+            been posted)
+    """
+    req = request.Request(
+        f"{api_url}/repos/{repository}/issues/{issue_number}/comments",
+        method='POST',
+        data=json.dumps({'body': body}).encode(),
+        headers={
+            'Accept': 'application/vnd.github.v3+json',
+            'Authorization': f'token {github_token}',
+            'Content-Type': 'application/json',
+        },
+    )
+
+    try:
+        with request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read().decode()).get('html_url')
+    except error.HTTPError as e:
+        raise ValueError(f"GitHub API error: {e.code} {e.reason}")
+    except error.URLError as e:
+        # urllib raises URLError only while connecting and sending.
+        raise ValueError(f"GitHub API request failed: {e.reason}")
+    except OSError as e:
+        raise ValueError(f"No response from GitHub API, the comment may have been posted: {e}")
+
+
+def post_comments(repository, issue_number, comments, github_token, api_url=GITHUB_API_URL):
+    """
+    Render and post several comments to an issue.
+
+    Every comment is rendered before any is posted, so a bad template key
+    posts nothing. If posting fails partway, the comments already posted
+    are listed in a warning before the error is raised, so that a rerun
+    can avoid posting them twice.
+
+    Args:
+        comments: List of (template_key, values) tuples
+
+    Returns:
+        list: The html_url of each posted comment
+    """
+    bodies = [render(template_key, values) for template_key, values in comments]
+    urls = []
+    for body in bodies:
+        try:
+            urls.append(post_comment(repository, issue_number, body, github_token, api_url))
+        except ValueError:
+            if urls:
+                print(f"::warning::{len(urls)} of {len(bodies)} comment(s) were posted before the failure: "
+                      f"{', '.join(urls)}", file=sys.stderr)
+            raise
+    return urls
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    repository = os.environ.get('GITHUB_REPOSITORY')
+    issue_number = os.environ.get('ISSUE_NUMBER')
+    template_keys = [key.strip() for key in (os.environ.get('TEMPLATE_KEY') or '').split(',') if key.strip()]
+
+    if not repository or not issue_number or not template_keys:
+        error_msg = 'GITHUB_REPOSITORY, ISSUE_NUMBER and TEMPLATE_KEY environment variables are required'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        values = {'ERROR_MESSAGE': os.environ.get('ERROR_MESSAGE', '')}
+        urls = post_comments(
+            repository,
+            issue_number,
+            [(template_key, values) for template_key in template_keys],
+            os.environ.get('GITHUB_TOKEN'),
+        )
+        for template_key, url in zip(template_keys, urls):
+            print(f'Posted comment to issue #{issue_number} using template: {template_key} ({url})')
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    profiled(main)()
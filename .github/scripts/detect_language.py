@@ -6,28 +6,39 @@ Detects the primary programming language of a GitHub repository.
 Queries the GitHub API to get language statistics and identifies the primary
 supported language (Java, Kotlin, Python, or Ruby) with the most bytes of code.
 Kotlin is treated as Java for consistency.
+
+For catalog-wide analytics, detect_languages_batch applies the same rules to
+many repositories at once, fetching the languages of a batch of repositories
+in a single GraphQL query with one alias per repository.
 """
 
 import json
 import os
-import re
 import sys
+import time
 from urllib import request, error
 
-from github_actions_utils import set_output
+import hedged_request
+from github_actions_utils import profiled, set_output, write_step_summary
+from github_ref import extract_owner_repo
 
 
 SUPPORTED_LANGUAGES = {'java', 'kotlin', 'python', 'ruby'}
 
 LANGUAGE_ALIASES = {'kotlin': 'Java'}
 
+GRAPHQL_URL = 'https://api.github.com/graphql'
+
+# Repositories fetched per GraphQL query, and languages fetched per repository.
+BATCH_SIZE = 50
+LANGUAGES_PER_REPO = 100
 
-def extract_owner_repo(url):
-    """Extract owner and repo from GitHub URL."""
-    pattern = r'(?:https://)?(?:www\.)?github\.com/([^/]+)/([^/]+)'
-    if match := re.match(pattern, url):
-        return match.group(1), match.group(2).rstrip('/')
-    raise ValueError(f"Could not extract owner/repo from URL: {url}")
+# Seconds a batch query may take, and how often a failed batch query is tried
+# (with exponential backoff from BATCH_BACKOFF seconds) before its
+# repositories are reported as errors.
+BATCH_TIMEOUT = 60
+BATCH_ATTEMPTS = 3
+BATCH_BACKOFF = 5.0
 
 
 def fetch_languages(owner, repo, github_token=None):
@@ -39,14 +50,167 @@ def fetch_languages(owner, repo, github_token=None):
     })
 
     try:
-        with request.urlopen(req) as response:
-            return json.loads(response.read().decode())
+        return json.loads(hedged_request.fetch(req).decode())
     except error.HTTPError as e:
         if e.code == 404:
             raise ValueError(f"GitHub repository not found: {owner}/{repo}")
         raise ValueError(f"GitHub API error: {e.code} {e.reason}")
 
 
+def primary_language(languages_data):
+    """
+    Pick the primary supported language from language byte counts.
+
+    Returns:
+        str: The supported language with the most bytes, with aliases applied
+             (Kotlin is returned as "Java"), or "Unknown"
+    """
+    # Filter and aggregate supported languages
+    supported_langs = {
+        lang: bytes_count
+        for lang, bytes_count in languages_data.items()
+        if lang.lower() in SUPPORTED_LANGUAGES
+    }
+
+    if not supported_langs:
+        return "Unknown"
+
+    # Find language with most bytes and apply aliases
+    language = max(supported_langs, key=supported_langs.get)
+    return LANGUAGE_ALIASES.get(language.lower(), language)
+
+
+def build_languages_query(count, first=LANGUAGES_PER_REPO):
+    """Build a GraphQL query fetching the languages of `count` repositories, aliased r0..rN."""
+    params = ', '.join(f'$o{i}: String!, $n{i}: String!' for i in range(count))
+    fields = '\n'.join(
+        f'  r{i}: repository(owner: $o{i}, name: $n{i}) '
+        f'{{ languages(first: {first}) {{ edges {{ size node {{ name }} }} }} }}'
+        for i in range(count)
+    )
+    return f'query({params}) {{\n{fields}\n}}'
+
+
+def fetch_languages_batch(repos, github_token, api_url=GRAPHQL_URL, timeout=BATCH_TIMEOUT):
+    """
+    Fetch language statistics for many repositories in one GraphQL query.
+
+    Args:
+        repos: List of (owner, repo) tuples
+        github_token: GitHub token (the GraphQL API requires authentication)
+        api_url: GraphQL endpoint URL
+        timeout: Seconds allowed for the query
+
+    Returns:
+        list: One entry per repository, either a dict of language byte counts
+              or a ValueError describing why that repository failed
+
+    Raises:
+        ValueError: If the query as a whole fails
+    """
+    variables = {}
+    for i, (owner, repo) in enumerate(repos):
+        variables[f'o{i}'] = owner
+        variables[f'n{i}'] = repo
+
+    req = request.Request(api_url, method='POST', data=json.dumps({
+        'query': build_languages_query(len(repos)),
+        'variables': variables,
+    }).encode(), headers={
+        'Content-Type': 'application/json',
+        'Authorization': f'bearer {github_token}',
+    })
+
+    try:
+        with request.urlopen(req, timeout=timeout) as response:
+            payload = json.loads(response.read().decode())
+    except error.HTTPError as e:
+        raise ValueError(f"GitHub API error: {e.code} {e.reason}")
+    except OSError as e:
+        raise ValueError(f"GitHub API request failed: {getattr(e, 'reason', e)}")
+
+    data = payload.get('data') or {}
+    if not data and payload.get('errors'):
+        raise ValueError(f"GitHub GraphQL error: {payload['errors'][0].get('message')}")
+
+    alias_errors = {}
+    for err in payload.get('errors') or []:
+        path = err.get('path') or []
+        if path:
+            alias_errors.setdefault(path[0], err)
+
+    results = []
+    for i, (owner, repo) in enumerate(repos):
+        repository = data.get(f'r{i}')
+        if repository is None:
+            err = alias_errors.get(f'r{i}') or {'type': 'NOT_FOUND', 'message': 'not found'}
+            if err.get('type') == 'NOT_FOUND':
+                results.append(ValueError(f"GitHub repository not found: {owner}/{repo} ({err.get('message')})"))
+            else:
+                results.append(ValueError(
+                    f"GitHub GraphQL error for {owner}/{repo}: {err.get('type') or 'ERROR'}: {err.get('message')}"
+                ))
+        else:
+            results.append({
+                edge['node']['name']: edge['size']
+                for edge in repository['languages']['edges']
+            })
+    return results
+
+
+def detect_languages_batch(urls, github_token, batch_size=BATCH_SIZE, api_url=GRAPHQL_URL, sleep=time.sleep):
+    """
+    Detect the primary supported language of many repositories.
+
+    Results are streamed as each batch completes. A repository that cannot be
+    parsed or accessed (for example, one that has been deleted) yields an
+    error without failing the rest of its batch. A batch query that fails as
+    a whole (a 502, a secondary rate limit, a timeout) is retried with
+    backoff; if it keeps failing, each of its repositories yields the error
+    and the remaining batches still run.
+
+    Args:
+        urls: Iterable of GitHub repository URLs
+        github_token: GitHub token (the GraphQL API requires authentication)
+        batch_size: Repositories fetched per GraphQL query
+
+    Yields:
+        tuple: (url, language, error) where exactly one of language/error is None
+    """
+    pending = []
+
+    def fetch_with_retries(refs):
+        for attempt in range(BATCH_ATTEMPTS):
+            try:
+                return fetch_languages_batch(refs, github_token, api_url)
+            except ValueError as e:
+                if attempt == BATCH_ATTEMPTS - 1:
+                    return [e] * len(refs)
+                print(f"::warning::Batch of {len(refs)} repositories failed, retrying: {e}", file=sys.stderr)
+                sleep(BATCH_BACKOFF * 2 ** attempt)
+
+    def flush():
+        results = fetch_with_retries([ref for _, ref in pending])
+        for (pending_url, _), result in zip(pending, results):
+            if isinstance(result, ValueError):
+                yield pending_url, None, str(result)
+            else:
+                yield pending_url, primary_language(result), None
+        pending.clear()
+
+    for url in urls:
+        try:
+            pending.append((url, extract_owner_repo(url)))
+        except ValueError as e:
+            yield url, None, str(e)
+            continue
+        if len(pending) >= batch_size:
+            yield from flush()
+
+    if pending:
+        yield from flush()
+
+
 def detect_language(url, github_token=None):
     """
     Detect the primary supported language in a GitHub repository.
@@ -70,26 +234,52 @@ def detect_language(url, github_token=None):
     languages_data = fetch_languages(owner, repo, github_token)
     print(f"Language data: {json.dumps(languages_data)}")
 
-    # Filter and aggregate supported languages
-    supported_langs = {
-        lang: bytes_count
-        for lang, bytes_count in languages_data.items()
-        if lang.lower() in SUPPORTED_LANGUAGES
-    }
+    language = primary_language(languages_data)
+    if language != "Unknown":
+        print(f"Detected primary language: {language}")
+    return language
 
-    if not supported_langs:
-        return "Unknown"
 
-    # Find language with most bytes and apply aliases
-    primary_language = max(supported_langs, key=supported_langs.get)
-    primary_language = LANGUAGE_ALIASES.get(primary_language.lower(), primary_language)
+def batch_main(urls_file):
+    """
+    Detect languages for every repository URL in a file, one URL per line.
 
-    print(f"Detected primary language: {primary_language}")
-    return primary_language
+    Prints one JSON object per repository and summarises the counts per
+    language in the job summary.
+    """
+    github_token = os.environ.get('GITHUB_TOKEN')
+    if not github_token:
+        error_msg = 'GITHUB_TOKEN is required for batch language detection'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        with open(urls_file) as f:
+            urls = [line.strip() for line in f if line.strip()]
+
+        counts = {}
+        for url, language, error_msg in detect_languages_batch(urls, github_token):
+            print(json.dumps({'url': url, 'language': language, 'error': error_msg}))
+            key = language or 'Error'
+            counts[key] = counts.get(key, 0) + 1
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    rows = '\n'.join(f'| {language} | {count} |' for language, count in sorted(counts.items()))
+    write_step_summary(f'| Language | Repositories |\n| --- | ---: |\n{rows}')
 
 
 def main():
     """Main entry point for GitHub Actions workflow."""
+    urls_file = os.environ.get('URLS_FILE')
+    if urls_file:
+        batch_main(urls_file)
+        return
+
     url = os.environ.get('URL')
 
     if not url:
@@ -121,4 +311,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    profiled(hedged_request.reporting(main))()
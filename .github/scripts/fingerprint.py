@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+"""
+Detects submissions that are near-duplicates of existing store extensions.
+
+validate_repo rejects forks, but a copy of an existing BApp pushed as a new
+repository, or an extension resubmitted under a new name, is not a fork.
+Here a submission's source files are streamed from its tarball, stripped of
+comments and import boilerplate, tokenized, and cut into overlapping token
+shingles. The shingle hashes are reduced to a MinHash signature, whose
+matching slots estimate the Jaccard similarity of two extensions' shingle
+sets.
+
+Signatures of the store's extensions are kept in a locality-sensitive-hash
+index: each signature is split into bands, and only extensions sharing a
+whole band with the submission are compared with it. Accepted extensions
+are added to the index one at a time.
+"""
+
+import base64
+import json
+import os
+import random
+import re
+import sys
+import zlib
+from array import array
+
+from github_actions_utils import profiled, set_output
+from github_ref import extract_owner_repo
+from stream_tarball import LANGUAGE_EXTENSIONS, inspect_tarball
+
+
+DEFAULT_INDEX_PATH = '.portal-cache/fingerprints.json'
+
+NUM_PERM = 128
+
+# BANDS * ROWS must equal NUM_PERM. Extensions sharing any band of ROWS slots
+# become candidates; with 32 bands of 4 rows, pairs around 0.5 similarity
+# are found with high probability.
+BANDS = 32
+ROWS = 4
+
+SEED = 1
+
+# Tokens per shingle.
+SHINGLE_SIZE = 7
+
+DEFAULT_THRESHOLD = 0.5
+
+# Source files larger than this are assumed to be generated or vendored.
+MAX_FILE_SIZE = 256 * 1024
+
+# Mersenne prime used as the modulus of the MinHash permutations.
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Signature slots are below MERSENNE_PRIME, so each packs into 8 bytes.
+SLOT_BYTES = 8
+
+C_COMMENTS = re.compile(rb'//[^\n]*|/\*.*?\*/', re.DOTALL)
+HASH_COMMENTS = re.compile(rb'#[^\n]*')
+
+COMMENT_PATTERNS = {
+    '.java': C_COMMENTS,
+    '.kt': C_COMMENTS,
+    '.kts': C_COMMENTS,
+    '.py': HASH_COMMENTS,
+    '.rb': HASH_COMMENTS,
+}
+
+# Lines every extension has in common, such as imports of the Burp API.
+BOILERPLATE_PATTERN = re.compile(rb'^[ \t]*(?:package|import|from|require)\b[^\n]*', re.MULTILINE)
+
+TOKEN_PATTERN = re.compile(rb'[A-Za-z_$][\w$]*|\d+|\S')
+
+
+def permutations(num_perm=NUM_PERM, seed=SEED):
+    """Return the (a, b) coefficients of the hash permutations (a * x + b) mod p."""
+    rng = random.Random(seed)
+    return [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+
+PERMUTATIONS = permutations()
+
+
+def source_tokens(content, extension):
+    """Return the tokens of a source file, without comments or import boilerplate."""
+    content = COMMENT_PATTERNS[extension].sub(b' ', content)
+    content = BOILERPLATE_PATTERN.sub(b' ', content)
+    return TOKEN_PATTERN.findall(content)
+
+
+def shingle_hashes(tokens, size=SHINGLE_SIZE):
+    """Return the 32-bit hashes of every run of `size` consecutive tokens."""
+    if len(tokens) < size:
+        return {zlib.crc32(b' '.join(tokens))} if tokens else set()
+    return {zlib.crc32(b' '.join(tokens[i:i + size])) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(hashes):
+    """
+    Reduce a set of shingle hashes to a MinHash signature.
+
+    This is NUM_PERM multiplications per shingle in pure Python, about 0.7s
+    for the 20,000 shingles of a large extension. It runs once per
+    submission, next to a tarball download that takes longer.
+
+    Raises:
+        ValueError: If there are no shingles to fingerprint
+    """
+    if not hashes:
+        raise ValueError("No source files found to fingerprint")
+    hashes = list(hashes)
+    return [min([(a * x + b) % MERSENNE_PRIME for x in hashes]) for a, b in PERMUTATIONS]
+
+
+def pack(signature):
+    """Pack a signature into bytes, SLOT_BYTES little-endian bytes per slot."""
+    packed = array('Q', signature)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack(packed):
+    signature = array('Q', packed)
+    if sys.byteorder == 'big':
+        signature.byteswap()
+    return signature.tolist()
+
+
+def similarity(signature_a, signature_b):
+    """Estimate the Jaccard similarity of two signatures' shingle sets."""
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / len(signature_a)
+
+
+class FingerprintInspector:
+    """
+    Collects shingle hashes from source files, for use with stream_tarball.
+
+    Shingles never span two files, so file order does not affect the
+    fingerprint.
+    """
+
+    def __init__(self):
+        self.hashes = set()
+        self._chunks = []
+        self._extension = None
+
+    def _finish_file(self):
+        if self._extension is not None:
+            tokens = source_tokens(b''.join(self._chunks), self._extension)
+            self.hashes.update(shingle_hashes(tokens))
+        self._chunks = []
+        self._extension = None
+
+    def start(self, path, size):
+        self._finish_file()
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in LANGUAGE_EXTENSIONS or not 0 < size <= MAX_FILE_SIZE:
+            return False
+        self._extension = extension
+        return True
+
+    def update(self, chunk):
+        self._chunks.append(chunk)
+        return True
+
+    def result(self):
+        """
+        Returns:
+            list: The MinHash signature of the source files seen
+
+        Raises:
+            ValueError: If no source files were seen
+        """
+        self._finish_file()
+        return minhash(self.hashes)
+
+
+def fingerprint_repository(owner, repo, ref='HEAD', github_token=None):
+    """Stream a repository's tarball and return the MinHash signature of its sources."""
+    inspector, = inspect_tarball(owner, repo, ref, [FingerprintInspector()], github_token)
+    return inspector.result()
+
+
+class FingerprintIndex:
+    """
+    Persistent LSH index of extension signatures.
+
+    Signatures are kept packed (see pack()), as base64 in the file and as
+    bytes in memory, and a band is simply its slice of the packed bytes.
+    Loading decodes each signature once and builds nothing per band, and a
+    query finds its candidates by comparing band slices; with 5,000
+    extensions, loading and querying take about 0.1s together.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.signatures = {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        if (data.get('num_perm'), data.get('bands'), data.get('seed')) != (NUM_PERM, BANDS, SEED):
+            raise ValueError(f"Fingerprint index {path} was built with different MinHash parameters")
+        for name, signature in data['signatures'].items():
+            # Indexes written before signatures were packed hold lists of slots.
+            self.signatures[name] = pack(signature) if isinstance(signature, list) else base64.b64decode(signature)
+
+    def add(self, name, signature):
+        """Index an extension's signature, replacing any earlier one under the same name."""
+        self.signatures[name] = pack(signature)
+
+    def remove(self, name):
+        self.signatures.pop(name, None)
+
+    def query(self, signature, threshold=DEFAULT_THRESHOLD):
+        """
+        Find indexed extensions similar to a signature.
+
+        Only extensions sharing a whole band with the signature are compared
+        with it.
+
+        Returns:
+            list: (name, similarity) tuples at or above the threshold, most similar first
+        """
+        packed = pack(signature)
+        width = ROWS * SLOT_BYTES
+        bands = [(start, start + width, packed[start:start + width]) for start in range(0, len(packed), width)]
+        candidates = [
+            name for name, other in self.signatures.items()
+            if any(other[start:end] == key for start, end, key in bands)
+        ]
+        matches = [(name, similarity(signature, unpack(self.signatures[name]))) for name in candidates]
+        return sorted(
+            ((name, score) for name, score in matches if score >= threshold),
+            key=lambda match: (-match[1], match[0]),
+        )
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w') as f:
+            signatures = {name: base64.b64encode(packed).decode() for name, packed in self.signatures.items()}
+            json.dump(
+                {'num_perm': NUM_PERM, 'bands': BANDS, 'seed': SEED, 'signatures': signatures},
+                f, separators=(',', ':'),
+            )
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    mode = os.environ.get('MODE') or 'check'
+    repo_url = os.environ.get('REPO_URL')
+    extension_name = os.environ.get('EXTENSION_NAME')
+
+    if not repo_url or mode not in ('check', 'add') or (mode == 'add' and not extension_name):
+        error_msg = 'REPO_URL environment variable is required, MODE must be check or add, and add requires EXTENSION_NAME'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        owner, repo = extract_owner_repo(repo_url)
+        index = FingerprintIndex(os.environ.get('FINGERPRINT_INDEX') or DEFAULT_INDEX_PATH)
+        signature = fingerprint_repository(
+            owner, repo, os.environ.get('REF') or 'HEAD', os.environ.get('GITHUB_TOKEN')
+        )
+
+        if mode == 'add':
+            index.add(extension_name, signature)
+            index.save()
+            print(f'Added {extension_name} to the fingerprint index ({len(index.signatures)} extensions)')
+            return
+
+        threshold = float(os.environ.get('THRESHOLD') or DEFAULT_THRESHOLD)
+        matches = index.query(signature, threshold)
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    for name, score in matches:
+        print(f'::warning::Submission is {score:.0%} similar to existing extension {name}')
+    set_output('near_duplicates', json.dumps([{'name': name, 'similarity': score} for name, score in matches]))
+    set_output('is_near_duplicate', 'true' if matches else 'false')
+
+
+if __name__ == '__main__':
+    profiled(main)()
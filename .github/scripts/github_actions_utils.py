@@ -4,11 +4,19 @@
 Utilities for GitHub Actions integration.
 
 Provides helpers for setting outputs in a way that works both within
-GitHub Actions and for local testing/development.
+GitHub Actions and for local testing/development, and opt-in profiling
+of a script's main function.
 """
 
-import sys
+import io
 import os
+import sys
+
+
+PROFILE_MODES = {'cpu', 'mem', 'both'}
+
+# Entries reported in the step summary and top-allocation report.
+PROFILE_TOP_ENTRIES = 15
 
 
 def set_output(key, value):
@@ -45,3 +53,112 @@ def set_output(key, value):
     else:
         # Fallback for local testing
         print(f'{key}={value}')
+
+
+def write_step_summary(markdown):
+    """
+    Append Markdown to the GitHub Actions job summary.
+
+    Writes to GITHUB_STEP_SUMMARY if running in GitHub Actions, or prints to
+    stdout for local testing.
+    """
+    summary_path = os.environ.get('GITHUB_STEP_SUMMARY')
+    if summary_path:
+        try:
+            with open(summary_path, 'a') as f:
+                f.write(f'{markdown}\n')
+        except Exception as e:
+            print(f'::warning::Could not write to GITHUB_STEP_SUMMARY: {e}', file=sys.stderr)
+    else:
+        print(markdown)
+
+
+def profiled(main):
+    """
+    Wrap a script's main function with opt-in profiling.
+
+    Profiling is controlled by the PORTAL_PROFILE environment variable:
+    "cpu" runs main under cProfile, "mem" under tracemalloc, and "both"
+    under both. Reports are written to PORTAL_PROFILE_DIR (default
+    "profile-reports") so they can be uploaded as an artifact, and the top
+    entries are added to the job summary. When PORTAL_PROFILE is unset,
+    main is returned unchanged.
+
+    Example:
+        if __name__ == '__main__':
+            profiled(main)()
+    """
+    mode = os.environ.get('PORTAL_PROFILE', '').strip().lower()
+    if not mode:
+        return main
+    if mode not in PROFILE_MODES:
+        print(f'::warning::Ignoring unknown PORTAL_PROFILE mode: {mode}', file=sys.stderr)
+        return main
+
+    # Imported here so that scripts pay nothing for profiling unless it is enabled.
+    import cProfile
+    import functools
+    import tracemalloc
+    from pathlib import Path
+
+    @functools.wraps(main)
+    def wrapper(*args, **kwargs):
+        name = Path(sys.argv[0]).stem or main.__module__
+        output_dir = Path(os.environ.get('PORTAL_PROFILE_DIR') or 'profile-reports')
+        profiler = cProfile.Profile() if mode in ('cpu', 'both') else None
+
+        if mode in ('mem', 'both'):
+            tracemalloc.start()
+        if profiler:
+            profiler.enable()
+        try:
+            return main(*args, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+            snapshot = None
+            if tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            try:
+                _write_profile_reports(name, output_dir, profiler, snapshot)
+            except Exception as e:
+                print(f'::warning::Could not write profile reports: {e}', file=sys.stderr)
+
+    return wrapper
+
+
+def _write_profile_reports(name, output_dir, profiler, snapshot):
+    """Write .pstats and top-allocation reports and summarise them in the job summary."""
+    import pstats
+    from pathlib import Path
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sections = []
+
+    if profiler:
+        profiler.dump_stats(output_dir / f'{name}.pstats')
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP_ENTRIES)
+        (output_dir / f'{name}-cpu.txt').write_text(report.getvalue())
+
+        rows = sorted(profiler.getstats(), key=lambda entry: entry.totaltime, reverse=True)
+        lines = ['| Function | Calls | Cumulative (s) |', '| --- | ---: | ---: |']
+        for entry in rows[:PROFILE_TOP_ENTRIES]:
+            label = entry.code if isinstance(entry.code, str) else (
+                f'{Path(entry.code.co_filename).name}:{entry.code.co_firstlineno}({entry.code.co_name})'
+            )
+            lines.append(f'| `{label}` | {entry.callcount} | {entry.totaltime:.4f} |')
+        sections.append(f'### CPU profile: {name}\n\n' + '\n'.join(lines))
+
+    if snapshot:
+        stats = snapshot.statistics('lineno')[:PROFILE_TOP_ENTRIES]
+        (output_dir / f'{name}-mem.txt').write_text(''.join(f'{stat}\n' for stat in stats))
+
+        lines = ['| Location | Size (KiB) | Blocks |', '| --- | ---: | ---: |']
+        for stat in stats:
+            frame = stat.traceback[0]
+            lines.append(f'| `{Path(frame.filename).name}:{frame.lineno}` | {stat.size / 1024:.1f} | {stat.count} |')
+        sections.append(f'### Top allocations: {name}\n\n' + '\n'.join(lines))
+
+    write_step_summary('\n\n'.join(sections))
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+"""
+Parses GitHub repository and pull request references.
+
+Every script that accepts a GitHub link parses it here, so they all agree on
+what a link refers to. One precompiled pattern accepts https and ssh forms,
+with or without a scheme or "www.", an optional ".git" suffix, "/tree/<branch>"
+or "/pull/<number>", any further path, and a trailing query or fragment.
+
+Parsed references are immutable and carry a canonical key (lowercased, since
+GitHub names are case-insensitive) for comparisons and cache lookups. Bulk
+tools parse the same links many times over, so results are memoized.
+"""
+
+import functools
+import re
+
+
+# Distinct links whose parse results are kept.
+CACHE_SIZE = 65536
+
+NAME = r'[A-Za-z0-9_.-]+'
+
+REF_PATTERN = re.compile(
+    rf'''
+    \s*
+    (?:
+        (?:(?:https?|ssh|git)://)?      # scheme, if any
+        (?:[\w.-]+@)?                   # ssh user, as in ssh://git@github.com/
+        (?:www\.)?(?i:github\.com)/
+      | [\w.-]+@(?:www\.)?(?i:github\.com):  # scp-style ssh, as in git@github.com:owner/repo
+    )
+    (?P<owner>{NAME})/
+    (?P<repo>{NAME})                    # may end in ".git" (any case), which parse() drops
+    (?:
+        /pull/(?P<pull>\d+)(?:/[^?#]*)?
+      | /tree/(?P<branch>[^?#]+?)
+      | /[^?#]*
+    )?
+    /?(?:[?#].*)?\s*
+    ''',
+    re.VERBOSE,
+)
+
+
+class _Ref:
+    """Immutable base: attributes are set once, in __init__."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+
+class RepoRef(_Ref):
+    """
+    A repository, optionally at a branch.
+
+    Attributes:
+        owner / repo: Names as written in the link, without any ".git"
+        branch: Branch from a "/tree/<branch>" link, or None
+        key: Canonical "owner/repo" key, lowercased
+    """
+
+    __slots__ = ('owner', 'repo', 'branch', 'key')
+
+    def __init__(self, owner, repo, branch=None):
+        init = object.__setattr__
+        init(self, 'owner', owner)
+        init(self, 'repo', repo)
+        init(self, 'branch', branch)
+        init(self, 'key', f'{owner}/{repo}'.lower())
+
+    @property
+    def url(self):
+        """The repository's https URL, without any branch."""
+        return f'https://github.com/{self.owner}/{self.repo}'
+
+    def __eq__(self, other):
+        return isinstance(other, RepoRef) and (other.key, other.branch) == (self.key, self.branch)
+
+    def __hash__(self):
+        return hash((self.key, self.branch))
+
+    def __repr__(self):
+        branch = f', branch={self.branch!r}' if self.branch else ''
+        return f'RepoRef({self.owner!r}, {self.repo!r}{branch})'
+
+
+class PullRef(_Ref):
+    """
+    A pull request.
+
+    Attributes:
+        owner / repo: Names of the repository the pull request belongs to
+        number: Pull request number
+        key: Canonical "owner/repo#number" key, lowercased
+    """
+
+    __slots__ = ('owner', 'repo', 'number', 'key')
+
+    def __init__(self, owner, repo, number):
+        number = int(number)
+        init = object.__setattr__
+        init(self, 'owner', owner)
+        init(self, 'repo', repo)
+        init(self, 'number', number)
+        init(self, 'key', f'{owner}/{repo}#{number}'.lower())
+
+    @property
+    def repository(self):
+        """The RepoRef of the repository the pull request belongs to."""
+        return RepoRef(self.owner, self.repo)
+
+    @property
+    def url(self):
+        return f'https://github.com/{self.owner}/{self.repo}/pull/{self.number}'
+
+    def __eq__(self, other):
+        return isinstance(other, PullRef) and other.key == self.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f'PullRef({self.owner!r}, {self.repo!r}, {self.number})'
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def parse(url):
+    """
+    Parse a GitHub link.
+
+    Returns:
+        PullRef for a pull request link, RepoRef for any other link into a
+        repository, or None if the link is not a GitHub repository link
+    """
+    match = REF_PATTERN.fullmatch(url) if isinstance(url, str) else None
+    if match is None:
+        return None
+    owner, repo, pull, branch = match.group('owner', 'repo', 'pull', 'branch')
+    if repo[-len('.git'):].lower() == '.git':
+        repo = repo[:-len('.git')]
+        if not repo:
+            return None
+    if pull:
+        return PullRef(owner, repo, pull)
+    return RepoRef(owner, repo, branch)
+
+
+def parse_repo(url):
+    """Return the RepoRef of the repository a link points into, or None if it is not a GitHub link."""
+    ref = parse(url)
+    return ref.repository if isinstance(ref, PullRef) else ref
+
+
+def extract_owner_repo(url):
+    """Extract owner and repo from GitHub URL"""
+    ref = parse_repo(url)
+    if ref is None:
+        raise ValueError(f"Could not extract owner/repo from URL: {url}")
+    return ref.owner, ref.repo
+
+
+def extract_pr_ref(url):
+    """Extract owner, repo and pull request number from a GitHub pull request URL."""
+    ref = parse(url)
+    if not isinstance(ref, PullRef):
+        raise ValueError(
+            f"Could not extract a pull request reference from URL: {url}. "
+            "Expected a link of the form https://github.com/PortSwigger/<repo>/pull/<number>."
+        )
+    return ref.owner, ref.repo, str(ref.number)
+
+
+def normalize_url(url):
+    """
+    Normalize a URL for comparison.
+
+    GitHub links become their lowercased canonical https URL; anything else
+    just has a trailing slash or ".git" dropped and is lowercased.
+    """
+    ref = parse(url)
+    if ref is not None:
+        return ref.url.lower()
+    value = (url or '').strip().rstrip('/')
+    if value.lower().endswith('.git'):
+        value = value[:-len('.git')]
+    return value.rstrip('/').lower()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+"""
+Hedged HTTP GETs for idempotent GitHub API calls.
+
+An occasional GitHub API response stalls for many seconds and dominates the
+time a validation step takes. A hedged request sends the request once and,
+if the response has not started within a delay taken from a percentile of
+recently observed latencies, sends it again on a separate connection;
+whichever response arrives first is used. Only idempotent GETs may be
+hedged.
+
+Every call has an overall deadline, and the number of hedges is capped at a
+fraction of the requests made so that hedging cannot double the load on
+the API. HedgePolicy.metrics records how often hedging was needed and how
+often the hedge won.
+
+Each script makes only a few calls, too few to learn a percentile from, so
+scripts wrap their main function in reporting(): the latency window of
+DEFAULT_POLICY is loaded from HEDGE_LATENCY_FILE before the run and saved
+after it, and the run's hedging activity is added to the job summary.
+"""
+
+import functools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from urllib import request, error
+
+from github_actions_utils import write_step_summary
+
+
+# Seconds a call may take in total, across the original request and its hedge.
+DEFAULT_DEADLINE = 30.0
+
+DEFAULT_LATENCY_PATH = '.portal-cache/hedge-latencies.json'
+
+
+class HedgePolicy:
+    """
+    Decides when to hedge, based on recent time-to-response latencies.
+
+    Args:
+        percentile: Latency percentile used as the hedge delay (0-1)
+        min_delay / max_delay: Bounds on the hedge delay, in seconds
+        initial_delay: Delay used until min_samples latencies are known
+        max_hedge_ratio: Fraction of requests that may be hedged
+        hedge_burst: Hedges allowed on top of the ratio (so one-off
+            scripts making a handful of calls can still hedge)
+        window: Number of recent latencies kept
+    """
+
+    def __init__(self, percentile=0.95, min_delay=0.25, max_delay=5.0, initial_delay=1.0,
+                 min_samples=20, max_hedge_ratio=0.1, hedge_burst=1, window=200):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.hedge_burst = hedge_burst
+        self.latencies = deque(maxlen=window)
+        self.metrics = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'hedges_capped': 0, 'deadlines': 0}
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """Return the seconds to wait for a response before hedging."""
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return min(self.max_delay, max(self.min_delay, ordered[index]))
+
+    def record(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+
+    def load(self, path):
+        """Add the latencies saved by an earlier run, if there are any."""
+        try:
+            with open(path) as f:
+                latencies = [float(latency) for latency in json.load(f)]
+        except FileNotFoundError:
+            return
+        except (ValueError, TypeError):
+            print(f'::warning::Ignoring unreadable latency file {path}', file=sys.stderr)
+            return
+        with self._lock:
+            self.latencies.extend(latencies)
+
+    def save(self, path):
+        with self._lock:
+            latencies = list(self.latencies)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(latencies, f)
+
+    def count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def try_hedge(self):
+        """Claim a hedge if the hedge budget allows one."""
+        with self._lock:
+            budget = self.max_hedge_ratio * self.metrics['requests'] + self.hedge_burst
+            if self.metrics['hedged'] >= budget:
+                self.metrics['hedges_capped'] += 1
+                return False
+            self.metrics['hedged'] += 1
+            return True
+
+    def summary(self):
+        """Return a one-line description of hedging activity."""
+        m = self.metrics
+        return (f"{m['requests']} requests, {m['hedged']} hedged, {m['hedge_wins']} won by the hedge, "
+                f"{m['hedges_capped']} hedges capped, {m['deadlines']} deadlines exceeded")
+
+
+DEFAULT_POLICY = HedgePolicy()
+
+
+def _attempt(req, timeout, started, results, hedge, policy):
+    """
+    Perform one request, signalling `started` once the response headers arrive.
+
+    The latency is recorded whether or not this attempt wins, so that the
+    slow originals which get hedged are not left out of the percentile.
+    """
+    begin = time.monotonic()
+    try:
+        with request.urlopen(req, timeout=timeout) as response:
+            started.set()
+            latency = time.monotonic() - begin
+            policy.record(latency)
+            body = response.read()
+        results.put((hedge, latency, body, None))
+    except Exception as e:
+        started.set()
+        results.put((hedge, None, None, e))
+
+
+def fetch(req, deadline=DEFAULT_DEADLINE, policy=DEFAULT_POLICY):
+    """
+    Perform an idempotent GET, hedging it if the response is slow to start.
+
+    Args:
+        req: A urllib Request (or URL) for a GET
+        deadline: Seconds allowed for the whole call
+        policy: HedgePolicy deciding the hedge delay and budget
+
+    Returns:
+        bytes: The body of whichever response completed successfully first
+
+    Raises:
+        urllib.error.HTTPError: If the server returned a client error, or
+            every attempt ended in a 429 or server error
+        ValueError: If no response completed within the deadline
+    """
+    url = req.full_url if isinstance(req, request.Request) else req
+    policy.count('requests')
+    end = time.monotonic() + deadline
+    results = queue.Queue()
+    started = threading.Event()
+
+    def launch(hedge):
+        threading.Thread(
+            target=_attempt,
+            args=(req, max(0.001, end - time.monotonic()), started, results, hedge, policy),
+            daemon=True,
+        ).start()
+
+    launch(hedge=False)
+    in_flight = 1
+    if not started.wait(min(policy.delay(), deadline)) and policy.try_hedge():
+        launch(hedge=True)
+        in_flight += 1
+
+    last_error = None
+    while in_flight:
+        try:
+            hedge, latency, body, exc = results.get(timeout=max(0.0, end - time.monotonic()))
+        except queue.Empty:
+            break
+        in_flight -= 1
+        if exc is None:
+            if hedge:
+                policy.count('hedge_wins')
+            return body
+        if isinstance(exc, error.HTTPError) and (in_flight == 0 or (exc.code < 500 and exc.code != 429)):
+            # A client error is the answer the other attempt would get too; a
+            # transient 429 or 5xx only decides the call once nothing else can.
+            raise exc
+        last_error = exc
+
+    if last_error is not None and in_flight == 0:
+        raise last_error
+    policy.count('deadlines')
+    raise ValueError(f"GitHub API request timed out after {deadline:g}s: {url}")
+
+
+def reporting(main):
+    """
+    Wrap a script's main function so that DEFAULT_POLICY learns across runs.
+
+    The latency window is loaded from HEDGE_LATENCY_FILE (default
+    DEFAULT_LATENCY_PATH) before main runs. If main made any hedged
+    requests, the window is saved back and a summary of hedging activity is
+    added to the job summary.
+
+    Example:
+        if __name__ == '__main__':
+            profiled(hedged_request.reporting(main))()
+    """
+    @functools.wraps(main)
+    def wrapper(*args, **kwargs):
+        path = os.environ.get('HEDGE_LATENCY_FILE') or DEFAULT_LATENCY_PATH
+        DEFAULT_POLICY.load(path)
+        try:
+            return main(*args, **kwargs)
+        finally:
+            if DEFAULT_POLICY.metrics['requests']:
+                try:
+                    DEFAULT_POLICY.save(path)
+                except OSError as e:
+                    print(f'::warning::Could not save latency file {path}: {e}', file=sys.stderr)
+                write_step_summary(f'Hedged GitHub API requests: {DEFAULT_POLICY.summary()}')
+
+    return wrapper
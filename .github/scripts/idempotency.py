@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+
+"""
+Detects submission work that has already been completed.
+
+Comment edits, double-posted commands and /resubmit re-runs can all trigger
+the pipeline again for work that has already finished, which risks duplicate
+Jira tickets. Each run is identified by a key derived from the issue, the
+command, the normalized repository URL and the repository HEAD SHA; once a
+run completes its key is recorded, and a later run with the same key can
+stop straight away.
+
+Keys are recorded either in a small JSON state file (suitable for
+actions/cache) or as a hidden marker appended to the outcome comment on the
+issue.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from github_actions_utils import profiled, set_output
+from github_ref import extract_owner_repo, normalize_url
+from resolve_source_repo import github_api_get
+
+
+# Completed keys kept in a state file; the oldest are dropped beyond this.
+MAX_STATE_ENTRIES = 1000
+
+MARKER_PATTERN = re.compile(r'<!-- portal-run:([0-9a-f]{16}) -->')
+
+
+def normalize_command(command):
+    """Reduce a comment body or event name to its command word (e.g. "/resubmit")."""
+    words = (command or '').strip().split()
+    return words[0].lower() if words else ''
+
+
+def idempotency_key(issue_number, command, repo_url, head_sha):
+    """
+    Derive the idempotency key for a unit of pipeline work.
+
+    Args:
+        issue_number: The GitHub issue number
+        command: The command or event that triggered the run
+        repo_url: The submitted repository URL
+        head_sha: The repository HEAD commit SHA
+
+    Returns:
+        str: A 16 character hex key
+    """
+    material = '\n'.join([
+        str(issue_number),
+        normalize_command(command),
+        normalize_url(repo_url),
+        (head_sha or '').lower(),
+    ])
+    return hashlib.sha256(material.encode()).hexdigest()[:16]
+
+
+def fetch_head_sha(owner, repo, github_token=None):
+    """Return the SHA of the default branch HEAD of a repository."""
+    commit = github_api_get(
+        f"https://api.github.com/repos/{owner}/{repo}/commits/HEAD",
+        github_token,
+    )
+    return commit['sha']
+
+
+def comment_marker(key):
+    """Return the hidden marker recording a completed key in a comment body."""
+    return f'<!-- portal-run:{key} -->'
+
+
+def find_markers(bodies):
+    """Return the set of keys recorded by markers in a sequence of comment bodies."""
+    keys = set()
+    for body in bodies:
+        keys.update(MARKER_PATTERN.findall(body or ''))
+    return keys
+
+
+class FileStateStore:
+    """Completed keys kept in a JSON file mapping key to completion time."""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except FileNotFoundError:
+                self._entries = {}
+            except ValueError:
+                print(f'::warning::Ignoring unreadable state file {self.path}', file=sys.stderr)
+                self._entries = {}
+        return self._entries
+
+    def contains(self, key):
+        return key in self._load()
+
+    def record(self, key):
+        entries = self._load()
+        entries[key] = int(time.time())
+        if len(entries) > MAX_STATE_ENTRIES:
+            newest = sorted(entries.items(), key=lambda item: item[1])[-MAX_STATE_ENTRIES:]
+            self._entries = entries = dict(newest)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(entries, f, separators=(',', ':'))
+
+
+class CommentMarkerStore:
+    """Completed keys recorded as hidden markers in an issue's comments."""
+
+    def __init__(self, repository, issue_number, github_token=None):
+        self.repository = repository
+        self.issue_number = issue_number
+        self.github_token = github_token
+        self._keys = None
+        self._recorded = set()
+
+    def _load(self):
+        if self._keys is None:
+            bodies = []
+            page = 1
+            while True:
+                comments = github_api_get(
+                    f"https://api.github.com/repos/{self.repository}/issues/"
+                    f"{self.issue_number}/comments?per_page=100&page={page}",
+                    self.github_token,
+                )
+                bodies.extend(comment.get('body') for comment in comments)
+                if len(comments) < 100:
+                    break
+                page += 1
+            self._keys = find_markers(bodies)
+        return self._keys
+
+    def contains(self, key):
+        return key in self._recorded or key in self._load()
+
+    def record(self, key):
+        # The marker is appended to the outcome comment by the posting step,
+        # so recording needs none of the existing comments.
+        self._recorded.add(key)
+        return comment_marker(key)
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    mode = os.environ.get('MODE') or 'check'
+    issue_number = os.environ.get('ISSUE_NUMBER')
+    url = os.environ.get('URL')
+
+    if mode not in ('check', 'record') or not issue_number or not url:
+        error_msg = 'ISSUE_NUMBER and URL environment variables are required, and MODE must be check or record'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        github_token = os.environ.get('GITHUB_TOKEN')
+        head_sha = os.environ.get('HEAD_SHA')
+        if not head_sha:
+            owner, repo = extract_owner_repo(url)
+            head_sha = fetch_head_sha(owner, repo, github_token)
+
+        key = idempotency_key(issue_number, os.environ.get('COMMAND'), url, head_sha)
+        state_file = os.environ.get('STATE_FILE')
+        if state_file:
+            store = FileStateStore(state_file)
+        else:
+            store = CommentMarkerStore(os.environ.get('GITHUB_REPOSITORY'), issue_number, github_token)
+
+        set_output('key', key)
+        if mode == 'check':
+            processed = store.contains(key)
+            if processed:
+                print(f'Run {key} has already completed; skipping.')
+            set_output('already_processed', 'true' if processed else 'false')
+        else:
+            set_output('marker', store.record(key) or '')
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    profiled(main)()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+"""
+Resolves GitHub repositories to their stable numeric identity.
+
+Owner and repository names change when an author renames or transfers a
+repository, but the numeric repository ID does not. Resolving a URL here
+gives the ID together with the repository's current canonical html_url, and
+the ID <-> name mappings are cached on disk with a TTL so that repeat
+lookups and comparisons need no further API requests or redirects.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+from github_actions_utils import profiled, set_output
+from github_ref import normalize_url, parse_repo
+from resolve_source_repo import github_api_get
+
+
+DEFAULT_CACHE_PATH = '.portal-cache/repo-identity.json'
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+RepoIdentity = namedtuple('RepoIdentity', ['id', 'full_name', 'html_url'])
+
+
+def repo_name_key(url):
+    """Return the lowercased "owner/repo" cache key for a GitHub URL."""
+    ref = parse_repo(url)
+    if ref is None:
+        raise ValueError(f"Could not extract owner/repo from URL: {url}")
+    return ref.key
+
+
+class IdentityCache:
+    """
+    Persistent ID <-> name cache for repository identities.
+
+    The file holds each identity under its ID, plus an index from every
+    name the repository has been looked up by to that ID, so old names
+    keep resolving after a rename until their entry expires.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.repos = {}
+        self.names = {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            self.repos = data.get('repos', {})
+            self.names = data.get('names', {})
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            print(f'::warning::Ignoring unreadable identity cache {path}', file=sys.stderr)
+
+    def _fresh(self, entry):
+        return entry is not None and self.clock() - entry['fetched_at'] < self.ttl
+
+    def by_id(self, repo_id):
+        """Return the cached identity for a repository ID, or None if absent or expired."""
+        entry = self.repos.get(str(repo_id))
+        if not self._fresh(entry):
+            return None
+        return RepoIdentity(int(repo_id), entry['full_name'], entry['html_url'])
+
+    def by_name(self, name_key):
+        """Return the cached identity for an "owner/repo" key, or None if absent or expired."""
+        repo_id = self.names.get(name_key)
+        return None if repo_id is None else self.by_id(repo_id)
+
+    def store(self, name_key, identity):
+        """Record an identity, indexed by both the looked-up and the canonical name."""
+        self.repos[str(identity.id)] = {
+            'full_name': identity.full_name,
+            'html_url': identity.html_url,
+            'fetched_at': int(self.clock()),
+        }
+        self.names[name_key] = identity.id
+        self.names[identity.full_name.lower()] = identity.id
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({'repos': self.repos, 'names': self.names}, f, separators=(',', ':'))
+
+
+def fetch_identity(owner, repo, github_token=None):
+    """Fetch a repository's identity, following any rename or transfer redirect."""
+    data = github_api_get(f"https://api.github.com/repos/{owner}/{repo}", github_token)
+    return RepoIdentity(data['id'], data['full_name'], data['html_url'])
+
+
+def resolve_identity(url, cache, github_token=None):
+    """
+    Resolve a GitHub URL to its repository identity, using the cache where fresh.
+
+    Returns:
+        RepoIdentity: The numeric ID, current full name and canonical html_url
+
+    Raises:
+        ValueError: If the URL is not a GitHub repository URL or cannot be resolved
+    """
+    name_key = repo_name_key(url)
+    identity = cache.by_name(name_key)
+    if identity is None:
+        owner, repo = name_key.split('/')
+        identity = fetch_identity(owner, repo, github_token)
+        cache.store(name_key, identity)
+    return identity
+
+
+def same_repository(url_a, url_b, cache, github_token=None):
+    """Return whether two GitHub URLs refer to the same repository, by numeric ID."""
+    if normalize_url(url_a) == normalize_url(url_b):
+        return True
+    return resolve_identity(url_a, cache, github_token).id == resolve_identity(url_b, cache, github_token).id
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    url = os.environ.get('URL')
+
+    if not url:
+        error_msg = 'URL environment variable is required'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        cache = IdentityCache(os.environ.get('IDENTITY_CACHE') or DEFAULT_CACHE_PATH)
+        identity = resolve_identity(url, cache, os.environ.get('GITHUB_TOKEN'))
+        cache.save()
+        set_output('repo_id', identity.id)
+        set_output('canonical_url', identity.html_url)
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    profiled(main)()
@@ -15,50 +15,30 @@ be discussed on the GitHub issue.
 
 import sys
 import os
-import re
 import json
 from urllib import request, error
-from github_actions_utils import set_output
+import hedged_request
+from github_actions_utils import profiled, set_output
+from github_ref import extract_pr_ref, normalize_url
 
-def extract_pr_ref(url):
-    """Extract owner, repo and pull request number from a GitHub pull request URL."""
-    match = re.match(
-        r'(?:https://)?(?:www\.)?github\.com/([A-Za-z0-9._-]+)/([A-Za-z0-9._-]+)/pull/(\d+)',
-        url,
-    )
-    if not match:
-        raise ValueError(
-            f"Could not extract a pull request reference from URL: {url}. "
-            "Expected a link of the form https://github.com/PortSwigger/<repo>/pull/<number>."
-        )
+class GitHubNotFound(ValueError):
+    """The GitHub API answered 404: the resource does not exist or is not visible."""
 
-    owner = match.group(1)
-    repo = match.group(2)
-    pull_number = match.group(3)
-    return owner, repo, pull_number
 
 def github_api_get(api_url, github_token=None):
-    """Fetch and decode a GitHub API resource, raising ValueError on failure."""
+    """Fetch and decode a GitHub API resource, raising ValueError (GitHubNotFound for a 404) on failure."""
     req = request.Request(api_url)
     if github_token:
         req.add_header('Authorization', f'token {github_token}')
     req.add_header('Accept', 'application/vnd.github.v3+json')
 
     try:
-        with request.urlopen(req) as response:
-            return json.loads(response.read().decode())
+        return json.loads(hedged_request.fetch(req).decode())
     except error.HTTPError as e:
         if e.code == 404:
-            raise ValueError(f"GitHub resource not found: {api_url}")
+            raise GitHubNotFound(f"GitHub resource not found: {api_url}")
         raise ValueError(f"GitHub API error: {e.code} {e.reason}")
 
-def normalize_url(url):
-    """Normalize a GitHub URL for comparison (drop trailing .git/slash, lowercase)."""
-    value = (url or '').strip().rstrip('/')
-    if value.endswith('.git'):
-        value = value[:-len('.git')]
-    return value.rstrip('/').lower()
-
 def resolve_source_repo(owner, repo, pull_number, github_token=None):
     """
     Resolve the source repository for an update pull request and verify the
@@ -92,13 +72,19 @@ def resolve_source_repo(owner, repo, pull_number, github_token=None):
     parent = base.get('parent')
     if base.get('fork') and parent and parent.get('html_url'):
         # Fork of an author's repository: the source is the parent.
-        source_url = parent['html_url']
+        source_repo = parent
     else:
         # No parent: the repository is PortSwigger-owned and is itself the source.
-        source_url = base['html_url']
+        source_repo = base
+    source_url = source_repo['html_url']
 
     # The update must originate from the source repository, not an arbitrary fork.
-    if normalize_url(head_url) != normalize_url(source_url):
+    # Numeric IDs survive renames and transfers, so prefer them to the URLs.
+    if head_repo.get('id') is not None and source_repo.get('id') is not None:
+        same_repo = head_repo['id'] == source_repo['id']
+    else:
+        same_repo = normalize_url(head_url) == normalize_url(source_url)
+    if not same_repo:
         raise ValueError(
             f"This update was raised from {head_url}, but updates must come from the "
             f"source repository {source_url} (the parent of the PortSwigger fork)."
@@ -106,7 +92,8 @@ def resolve_source_repo(owner, repo, pull_number, github_token=None):
 
     return source_url
 
-if __name__ == '__main__':
+def main():
+    """Main entry point for GitHub Actions workflow."""
     url = os.environ.get('URL')
     github_token = os.environ.get('GITHUB_TOKEN')  # Optional
 
@@ -125,3 +112,6 @@ if __name__ == '__main__':
         print(f'::error::{error_msg}', file=sys.stderr)
         set_output('error_message', error_msg)
         sys.exit(1)
+
+if __name__ == '__main__':
+    profiled(hedged_request.reporting(main))()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+"""
+Reports workflow run latency per job and per step.
+
+Completed runs of the portal workflows are synced incrementally from the
+Actions API into a local SQLite database: each sync pages through runs
+newest first, stops at the first run already seen, and then stores the
+jobs (with their steps) of each new run that has completed. Runs still
+queued or in progress are noted as pending and checked again on later
+syncs. Reports give p50/p95/p99 durations per job and per step over a
+rolling window, as Markdown or CSV.
+"""
+
+import csv
+import io
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+
+from github_actions_utils import profiled, set_output, write_step_summary
+from resolve_source_repo import GitHubNotFound, github_api_get
+
+
+GITHUB_API_URL = 'https://api.github.com'
+
+DEFAULT_WORKFLOWS = ('process-created-issue.yml', 'process-issue-comment.yml')
+
+DEFAULT_WINDOW_DAYS = 30
+
+PER_PAGE = 100
+
+PERCENTILES = (50, 95, 99)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    workflow TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    conclusion TEXT,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_workflow ON runs (workflow, created_at);
+CREATE TABLE IF NOT EXISTS pending_runs (
+    id INTEGER PRIMARY KEY,
+    workflow TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    conclusion TEXT,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_run ON jobs (run_id);
+CREATE TABLE IF NOT EXISTS steps (
+    job_id INTEGER NOT NULL REFERENCES jobs (id),
+    number INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    conclusion TEXT,
+    duration REAL,
+    PRIMARY KEY (job_id, number)
+);
+'''
+
+
+def parse_time(value):
+    """Parse an API timestamp such as "2024-05-01T10:00:00Z"."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+
+def duration(start, end):
+    """Return the seconds between two API timestamps, or None if either is missing."""
+    start, end = parse_time(start), parse_time(end)
+    if start is None or end is None:
+        return None
+    return max(0.0, (end - start).total_seconds())
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of a sorted list of values."""
+    rank = max(1, -(-pct * len(values) // 100))
+    return values[int(rank) - 1]
+
+
+def connect(path):
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def sync_workflow(db, repository, workflow, get=github_api_get, api_url=GITHUB_API_URL):
+    """
+    Store completed runs of a workflow that are newer than any already seen.
+
+    Runs are listed newest first until a run already seen is reached, then
+    handled oldest first, one transaction per run: completed runs are
+    stored, and runs still queued or in progress are recorded in
+    pending_runs. Pending runs from earlier syncs are fetched again and
+    stored once they complete, so a stuck run holds back nothing but
+    itself; a pending run that has since been deleted is dropped. The newest stored or pending run is always a safe point to
+    resume from, even if a sync is interrupted.
+
+    Returns:
+        int: The number of runs added
+    """
+    latest = db.execute(
+        'SELECT MAX(id) FROM (SELECT id FROM runs WHERE workflow = ? UNION SELECT id FROM pending_runs WHERE workflow = ?)',
+        (workflow, workflow),
+    ).fetchone()[0] or 0
+    pending = [row[0] for row in db.execute('SELECT id FROM pending_runs WHERE workflow = ?', (workflow,))]
+    new_runs = []
+    page = 1
+    while True:
+        data = get(
+            f"{api_url}/repos/{repository}/actions/workflows/{workflow}/runs"
+            f"?per_page={PER_PAGE}&page={page}"
+        )
+        runs = data.get('workflow_runs', [])
+        unseen = [run for run in runs if run['id'] > latest]
+        new_runs.extend(unseen)
+        if len(unseen) < len(runs) or len(runs) < PER_PAGE:
+            break
+        page += 1
+
+    added = 0
+    rechecked = []
+    for run_id in pending:
+        try:
+            rechecked.append(get(f"{api_url}/repos/{repository}/actions/runs/{run_id}"))
+        except GitHubNotFound:
+            print(f'::warning::Pending run {run_id} of {workflow} no longer exists; dropping it', file=sys.stderr)
+            db.execute('DELETE FROM pending_runs WHERE id = ?', (run_id,))
+            db.commit()
+    for run in sorted(rechecked + new_runs, key=lambda run: run['id']):
+        if run.get('status') != 'completed':
+            db.execute('INSERT OR IGNORE INTO pending_runs (id, workflow) VALUES (?, ?)', (run['id'], workflow))
+        else:
+            store_run(db, workflow, run, get, api_url, repository)
+            db.execute('DELETE FROM pending_runs WHERE id = ?', (run['id'],))
+            added += 1
+        db.commit()
+    return added
+
+
+def store_run(db, workflow, run, get, api_url, repository):
+    """Store a run together with its jobs and steps."""
+    db.execute(
+        'INSERT OR REPLACE INTO runs (id, workflow, created_at, conclusion, duration) VALUES (?, ?, ?, ?, ?)',
+        (run['id'], workflow, run['created_at'], run.get('conclusion'),
+         duration(run.get('run_started_at') or run['created_at'], run.get('updated_at'))),
+    )
+
+    page = 1
+    while True:
+        data = get(f"{api_url}/repos/{repository}/actions/runs/{run['id']}/jobs?per_page={PER_PAGE}&page={page}")
+        jobs = data.get('jobs', [])
+        for job in jobs:
+            db.execute(
+                'INSERT OR REPLACE INTO jobs (id, run_id, name, conclusion, duration) VALUES (?, ?, ?, ?, ?)',
+                (job['id'], run['id'], job['name'], job.get('conclusion'),
+                 duration(job.get('started_at'), job.get('completed_at'))),
+            )
+            db.executemany(
+                'INSERT OR REPLACE INTO steps (job_id, number, name, conclusion, duration) VALUES (?, ?, ?, ?, ?)',
+                [(job['id'], step['number'], step['name'], step.get('conclusion'),
+                  duration(step.get('started_at'), step.get('completed_at')))
+                 for step in job.get('steps') or []],
+            )
+        if len(jobs) < PER_PAGE:
+            return
+        page += 1
+
+
+def latency_rows(db, window_days=DEFAULT_WINDOW_DAYS, now=None):
+    """
+    Compute duration percentiles per workflow, job and step over a rolling window.
+
+    Returns:
+        list: (workflow, job, step, count, p50, p95, p99) tuples, where step is
+            '' for the job as a whole; skipped jobs and steps are excluded
+    """
+    now = now or datetime.now(timezone.utc)
+    since = (now - timedelta(days=window_days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    samples = {}
+    job_query = '''
+        SELECT runs.workflow, jobs.name, '', jobs.duration
+        FROM jobs JOIN runs ON runs.id = jobs.run_id
+        WHERE runs.created_at >= ? AND jobs.duration IS NOT NULL AND IFNULL(jobs.conclusion, '') != 'skipped'
+    '''
+    step_query = '''
+        SELECT runs.workflow, jobs.name, steps.name, steps.duration
+        FROM steps JOIN jobs ON jobs.id = steps.job_id JOIN runs ON runs.id = jobs.run_id
+        WHERE runs.created_at >= ? AND steps.duration IS NOT NULL AND IFNULL(steps.conclusion, '') != 'skipped'
+    '''
+    for query in (job_query, step_query):
+        for workflow, job, step, value in db.execute(query, (since,)):
+            samples.setdefault((workflow, job, step), []).append(value)
+
+    rows = []
+    for key in sorted(samples):
+        values = sorted(samples[key])
+        rows.append((*key, len(values), *(percentile(values, pct) for pct in PERCENTILES)))
+    return rows
+
+
+def format_markdown(rows):
+    lines = ['| Workflow | Job | Step | Runs | p50 (s) | p95 (s) | p99 (s) |',
+             '| --- | --- | --- | ---: | ---: | ---: | ---: |']
+    for workflow, job, step, count, *values in rows:
+        timings = ' | '.join(f'{value:.1f}' for value in values)
+        lines.append(f'| {workflow} | {job} | {step or "(job)"} | {count} | {timings} |')
+    return '\n'.join(lines)
+
+
+def format_csv(rows):
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(['workflow', 'job', 'step', 'runs', *(f'p{pct}' for pct in PERCENTILES)])
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    repository = os.environ.get('GITHUB_REPOSITORY')
+    report_format = os.environ.get('FORMAT') or 'markdown'
+
+    if not repository or report_format not in ('markdown', 'csv'):
+        error_msg = 'GITHUB_REPOSITORY environment variable is required, and FORMAT must be markdown or csv'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        github_token = os.environ.get('GITHUB_TOKEN')
+        workflows = (os.environ.get('WORKFLOWS') or ','.join(DEFAULT_WORKFLOWS)).split(',')
+        db = connect(os.environ.get('DB_PATH') or 'run-analytics.sqlite')
+
+        for workflow in (name.strip() for name in workflows if name.strip()):
+            added = sync_workflow(db, repository, workflow, get=lambda url: github_api_get(url, github_token))
+            print(f'Synced {added} new run(s) of {workflow}')
+
+        rows = latency_rows(db, int(os.environ.get('WINDOW_DAYS') or DEFAULT_WINDOW_DAYS))
+        report = format_markdown(rows) if report_format == 'markdown' else format_csv(rows)
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    report_path = os.environ.get('REPORT_PATH')
+    if report_path:
+        with open(report_path, 'w') as f:
+            f.write(report)
+    if report_format == 'markdown':
+        write_step_summary(report)
+    elif not report_path:
+        print(report, end='')
+
+
+if __name__ == '__main__':
+    profiled(main)()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+"""
+Fetches just enough of a repository to validate its build files.
+
+A blobless partial clone (--filter=blob:none) at depth 1 brings down the
+commit and its trees but no file contents, which is enough to list every
+path in the repository. The build files found in that listing define a
+sparse-checkout cone, and individual blobs are only downloaded, one at a
+time, when the build detector actually reads a file.
+"""
+
+import os
+import subprocess
+import sys
+
+from github_actions_utils import profiled, set_output
+from stream_tarball import build_system
+
+
+BUILD_FILE_NAMES = {
+    'pom.xml',
+    'build.gradle',
+    'build.gradle.kts',
+    'settings.gradle',
+    'settings.gradle.kts',
+    'gradlew',
+}
+
+# Seconds a git command may run, so that a stalled clone or blob fetch fails the step.
+GIT_TIMEOUT = 300
+
+
+def run_git(args, cwd=None, timeout=GIT_TIMEOUT):
+    """Run a git command and return its stdout, raising ValueError on failure or timeout."""
+    try:
+        result = subprocess.run(
+            ['git', *args],
+            cwd=cwd,
+            capture_output=True,
+            env={**os.environ, 'GIT_TERMINAL_PROMPT': '0'},
+            timeout=timeout,
+        )
+    except FileNotFoundError:
+        raise ValueError("git is not installed")
+    except subprocess.TimeoutExpired:
+        raise ValueError(f"git {args[0]} timed out after {timeout}s")
+
+    if result.returncode != 0:
+        stderr = result.stderr.decode(errors='replace').strip()
+        raise ValueError(f"git {args[0]} failed: {stderr}")
+    return result.stdout
+
+
+def sparse_cone(build_files):
+    """
+    Return the sparse-checkout cone directories for a set of build files.
+
+    Files at the repository root are always part of a cone, so only the
+    directories of nested (module) build files need to be listed.
+    """
+    return sorted({os.path.dirname(path) for path in build_files} - {''})
+
+
+class SparseFetcher:
+    """
+    A blobless, depth 1 clone of a repository with a build-file sparse cone.
+
+    The ref is passed to git clone --branch, so it must be a branch or tag
+    name; commit SHAs are not accepted. Without a ref the default branch is
+    cloned.
+
+    Example:
+        fetcher = SparseFetcher('https://github.com/owner/repo.git', 'extension-repo')
+        fetcher.fetch()
+        if fetcher.exists('pom.xml'):
+            pom = fetcher.read('pom.xml')
+    """
+
+    def __init__(self, url, dest, ref=None):
+        self.url = url
+        self.dest = dest
+        self.ref = ref
+        self.paths = set()
+        self.build_files = []
+
+    def fetch(self):
+        """Clone commit and trees only, then restrict the sparse cone to build-file directories."""
+        run_git([
+            'clone', '--filter=blob:none', '--depth', '1', '--no-checkout', '--sparse',
+            *(['--branch', self.ref] if self.ref else []),
+            self.url, self.dest,
+        ])
+
+        listing = run_git(['ls-tree', '-r', '-z', '--name-only', 'HEAD'], cwd=self.dest)
+        self.paths = {path for path in os.fsdecode(listing).split('\0') if path}
+        self.build_files = sorted(
+            path for path in self.paths if os.path.basename(path) in BUILD_FILE_NAMES
+        )
+
+        run_git(['sparse-checkout', 'set', '--cone', *sparse_cone(self.build_files)], cwd=self.dest)
+        return self
+
+    def exists(self, path):
+        """Return whether a file exists at HEAD, without downloading it."""
+        return path in self.paths
+
+    def read(self, path):
+        """Return the contents of a file at HEAD, fetching only its blob."""
+        if not self.exists(path):
+            raise ValueError(f"File not found in repository: {path}")
+        return run_git(['cat-file', 'blob', f'HEAD:{path}'], cwd=self.dest)
+
+    def checkout(self):
+        """Materialise the sparse cone (root files and build-file directories) in the work tree."""
+        run_git(['checkout'], cwd=self.dest)
+
+
+def detect_build_system(fetcher):
+    """
+    Detect the Java build system of a fetched repository, by the rules in stream_tarball.build_system.
+
+    Returns:
+        str: "Maven" or "Gradle"
+
+    Raises:
+        ValueError: If no supported build system or Gradle wrapper is found
+    """
+    return build_system({path for path in fetcher.paths if '/' not in path})
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    owner = os.environ.get('OWNER')
+    repo = os.environ.get('REPO')
+    dest = os.environ.get('DEST') or 'extension-repo'
+
+    if not owner or not repo:
+        error_msg = 'OWNER and REPO environment variables are required'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        fetcher = SparseFetcher(f'https://github.com/{owner}/{repo}.git', dest, os.environ.get('REF'))
+        fetcher.fetch()
+        print(f"Build files: {', '.join(fetcher.build_files) or 'none'}")
+        set_output('build_system', detect_build_system(fetcher))
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    profiled(main)()
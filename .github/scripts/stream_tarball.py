@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+"""
+Inspects a submission's repository by streaming its tarball.
+
+Rather than checking the repository out into the runner's workspace, the
+tarball for a ref is read straight off the HTTP response with tarfile in
+streaming mode. Each member is handed to a set of inspectors as it arrives;
+members no inspector wants are skipped without being buffered, and nothing
+is ever written to disk. Memory use is bounded by CHUNK_SIZE regardless of
+the size of the repository.
+
+An inspector implements three methods:
+
+    start(path, size) -> bool   Return True to receive the member's contents.
+    update(chunk) -> bool       Return False once no further content is needed.
+    result()                    Return the inspector's findings.
+"""
+
+import os
+import sys
+import tarfile
+from urllib import request, error
+
+from github_actions_utils import profiled, set_output
+
+
+GITHUB_API_URL = 'https://api.github.com'
+
+CHUNK_SIZE = 64 * 1024
+
+# Seconds the tarball download may stall (per connect or read) before it fails.
+TARBALL_TIMEOUT = 60
+
+LANGUAGE_EXTENSIONS = {
+    '.java': 'Java',
+    '.kt': 'Kotlin',
+    '.kts': 'Kotlin',
+    '.py': 'Python',
+    '.rb': 'Ruby',
+}
+
+BINARY_EXTENSIONS = {'.jar', '.class', '.war', '.zip', '.so', '.dll', '.dylib', '.exe'}
+
+# Bytes read from a member when sniffing for binary content.
+BINARY_SNIFF_SIZE = 8 * 1024
+
+
+def build_system(root_files):
+    """
+    Detect the Java build system from the names of the files at the repository root.
+
+    Returns:
+        str: "Maven" or "Gradle"
+
+    Raises:
+        ValueError: If no supported build system or Gradle wrapper is found
+    """
+    if 'pom.xml' in root_files:
+        return 'Maven'
+    if 'build.gradle' in root_files or 'build.gradle.kts' in root_files:
+        if 'gradlew' not in root_files:
+            raise ValueError(
+                "Gradle wrapper (gradlew) not found. Please include gradlew in your repository."
+            )
+        return 'Gradle'
+    raise ValueError(
+        "No build system found. Please ensure your repository contains pom.xml (Maven) "
+        "or build.gradle (Gradle). If using Gradle, please ensure to include the wrapper."
+    )
+
+
+class BuildFileInspector:
+    """Detects the Java build system from build files at the repository root."""
+
+    BUILD_FILES = {'pom.xml', 'build.gradle', 'build.gradle.kts', 'gradlew'}
+
+    def __init__(self):
+        self.found = set()
+
+    def start(self, path, size):
+        if path in self.BUILD_FILES:
+            self.found.add(path)
+        return False
+
+    def update(self, chunk):
+        return False
+
+    def result(self):
+        """See build_system()."""
+        return build_system(self.found)
+
+
+class LanguageInspector:
+    """Counts bytes of source code per supported language, by file extension."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def start(self, path, size):
+        language = LANGUAGE_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if language:
+            self.counts[language] = self.counts.get(language, 0) + size
+        return False
+
+    def update(self, chunk):
+        return False
+
+    def result(self):
+        return dict(self.counts)
+
+
+class BinaryInspector:
+    """Flags binary files, by extension or by a NUL byte near the start of the file."""
+
+    def __init__(self):
+        self.binaries = []
+        self._current = None
+        self._seen = 0
+
+    def start(self, path, size):
+        if os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS:
+            self.binaries.append(path)
+            return False
+        self._current = path
+        self._seen = 0
+        return size > 0
+
+    def update(self, chunk):
+        chunk = chunk[:BINARY_SNIFF_SIZE - self._seen]
+        self._seen += len(chunk)
+        if b'\0' in chunk:
+            self.binaries.append(self._current)
+            return False
+        return self._seen < BINARY_SNIFF_SIZE
+
+    def result(self):
+        return list(self.binaries)
+
+
+def default_inspectors():
+    """Return a fresh set of the standard inspectors."""
+    return [BuildFileInspector(), LanguageInspector(), BinaryInspector()]
+
+
+def strip_archive_prefix(name):
+    """Drop the "<owner>-<repo>-<sha>/" directory GitHub wraps tarball contents in."""
+    _, _, path = name.partition('/')
+    return path
+
+
+def inspect_stream(stream, inspectors):
+    """
+    Feed every regular file in a gzipped tar stream to the interested inspectors.
+
+    Args:
+        stream: A readable binary file object positioned at the start of the archive
+        inspectors: Inspectors to feed (see module docstring)
+    """
+    with tarfile.open(fileobj=stream, mode='r|gz') as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            path = strip_archive_prefix(member.name)
+            if not path:
+                continue
+
+            interested = [i for i in inspectors if i.start(path, member.size)]
+            if not interested:
+                # Unread members are skipped by the next iteration without buffering.
+                continue
+
+            content = archive.extractfile(member)
+            while interested:
+                chunk = content.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                interested = [i for i in interested if i.update(chunk)]
+
+
+def inspect_tarball(owner, repo, ref, inspectors, github_token=None, api_url=GITHUB_API_URL,
+                    timeout=TARBALL_TIMEOUT):
+    """
+    Stream the tarball of a repository ref through a set of inspectors.
+
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        ref: Branch, tag or commit SHA to fetch
+        inspectors: Inspectors to feed (see module docstring)
+        github_token: Optional GitHub token for authentication
+        api_url: Base URL of the GitHub API
+        timeout: Seconds the download may stall before it fails
+
+    Returns:
+        list: The inspectors, fed with every member of the archive
+
+    Raises:
+        ValueError: If the tarball cannot be fetched or read
+    """
+    req = request.Request(f"{api_url}/repos/{owner}/{repo}/tarball/{ref}", headers={
+        'Accept': 'application/vnd.github.v3+json',
+        **({"Authorization": f"token {github_token}"} if github_token else {})
+    })
+
+    try:
+        with request.urlopen(req, timeout=timeout) as response:
+            inspect_stream(response, inspectors)
+    except error.HTTPError as e:
+        if e.code == 404:
+            raise ValueError(f"GitHub repository or ref not found: {owner}/{repo}@{ref}")
+        raise ValueError(f"GitHub API error: {e.code} {e.reason}")
+    except OSError as e:
+        raise ValueError(f"GitHub API request failed: {getattr(e, 'reason', e)}")
+    except tarfile.TarError as e:
+        raise ValueError(f"Could not read repository archive for {owner}/{repo}@{ref}: {e}")
+
+    return inspectors
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    owner = os.environ.get('OWNER')
+    repo = os.environ.get('REPO')
+    ref = os.environ.get('REF') or 'HEAD'
+
+    if not owner or not repo:
+        error_msg = 'OWNER and REPO environment variables are required'
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+    try:
+        build, languages, binaries = inspect_tarball(
+            owner, repo, ref, default_inspectors(), os.environ.get('GITHUB_TOKEN')
+        )
+        print(f"Language bytes: {languages.result()}")
+        if binaries.result():
+            print(f"Binary files: {', '.join(binaries.result())}")
+        set_output('build_system', build.result())
+    except Exception as e:
+        error_msg = str(e)
+        print(f'::error::{error_msg}', file=sys.stderr)
+        set_output('error_message', error_msg)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    profiled(main)()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+"""
+Tests for bulk_dispatch.py
+Run with: python bulk_dispatch_test.py
+
+Dispatches are sent to a local HTTP server standing in for the GitHub API,
+so the tests need no network.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bulk_dispatch as bd
+from fakes import FakeClock, LocalServer, QuietHandler
+
+
+DISPATCH_PATH = '/repos/PortSwigger/extension-portal-internal/actions/workflows/sanitize-and-analyze.yml/dispatches'
+
+
+def extension(key, **overrides):
+    return {
+        'extension_name': f'Extension {key}',
+        'target_repo_url': f'https://github.com/author/{key.lower()}',
+        'compatible_products': 'community,dast',
+        'jira_ticket': key,
+        **overrides,
+    }
+
+
+class FakeDispatchAPI(LocalServer):
+    """
+    Accept workflow dispatches on a local HTTP server.
+
+    `responses` maps a Jira key to a list of (status, headers) returned for
+    successive dispatches of that extension; anything else is accepted.
+    """
+
+    def __init__(self, responses=None):
+        self.responses = {key: list(value) for key, value in (responses or {}).items()}
+        self.received = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        api = self
+
+        class Handler(QuietHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                key = body['inputs']['jira_ticket']
+                with api.lock:
+                    api.received.append((self.path, self.headers['Authorization'], body))
+                    api.in_flight += 1
+                    api.max_in_flight = max(api.max_in_flight, api.in_flight)
+                    queued = api.responses.get(key)
+                    status, headers = queued.pop(0) if queued else (204, {})
+                api.release.wait(1)
+                with api.lock:
+                    api.in_flight -= 1
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+        self.release.set()
+        super().__init__(Handler, threaded=True)
+
+    def keys(self):
+        return [body['inputs']['jira_ticket'] for _, _, body in self.received]
+
+
+class BuildDispatchPayloadTests(unittest.TestCase):
+    def test_matches_trigger_review_action(self):
+        self.assertEqual(bd.build_dispatch_payload(extension('BAPP-1')), {
+            'ref': 'main',
+            'inputs': {
+                'extension_name': 'Extension BAPP-1',
+                'target_repo_url': 'https://github.com/author/bapp-1',
+                'compatible_products': 'community,dast',
+                'jira_ticket': 'BAPP-1',
+                'issue_url': '',
+                'is_update': 'false',
+            },
+        })
+
+
+class RetryAfterTests(unittest.TestCase):
+    def test_retry_after_header(self):
+        self.assertEqual(bd.retry_after({'Retry-After': '30'}, now=0), 30)
+
+    def test_rate_limit_reset(self):
+        headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '1100'}
+        self.assertEqual(bd.retry_after(headers, now=1000), 100)
+
+    def test_default(self):
+        self.assertEqual(bd.retry_after({}, now=0), bd.DEFAULT_RETRY_AFTER)
+
+
+class PacerTests(unittest.TestCase):
+    def test_spaces_requests(self):
+        fake = FakeClock()
+        pacer = bd.Pacer(2.0, clock=fake, sleep=fake.sleep)
+        for _ in range(3):
+            pacer.wait()
+        self.assertEqual(fake.sleeps, [2.0, 2.0])
+
+    def test_pause_delays_next_request(self):
+        fake = FakeClock()
+        pacer = bd.Pacer(0.0, clock=fake, sleep=fake.sleep)
+        pacer.pause(30)
+        pacer.wait()
+        self.assertEqual(fake.sleeps, [30])
+
+    def test_pause_holds_back_threads_already_waiting(self):
+        fake = FakeClock()
+        pacer = bd.Pacer(1.0, clock=fake, sleep=fake.sleep)
+
+        def sleep(seconds):
+            # Another worker is throttled while this one sleeps on its slot.
+            if not fake.sleeps:
+                pacer.pause(30)
+            fake.sleep(seconds)
+
+        pacer.sleep = sleep
+        pacer.wait()
+        pacer.wait()
+        self.assertEqual(fake.now, 30)
+
+
+class BulkDispatchTests(unittest.TestCase):
+    def setUp(self):
+        self.pacer = bd.Pacer(0.0)
+        stderr = mock.patch('sys.stderr', new=StringIO())
+        stdout = mock.patch('sys.stdout', new=StringIO())
+        stderr.start()
+        stdout.start()
+        self.addCleanup(stderr.stop)
+        self.addCleanup(stdout.stop)
+
+    def test_dispatches_every_extension(self):
+        with FakeDispatchAPI() as api:
+            counts = bd.bulk_dispatch(
+                [extension(f'BAPP-{i}') for i in range(10)], 'token', pacer=self.pacer, api_url=api.url)
+
+        self.assertEqual(counts, {'accepted': 10, 'failed': 0, 'throttled': 0, 'unknown': 0, 'skipped': 0})
+        self.assertEqual(sorted(api.keys()), sorted(f'BAPP-{i}' for i in range(10)))
+        path, authorization, _ = api.received[0]
+        self.assertEqual(path, DISPATCH_PATH)
+        self.assertEqual(authorization, 'Bearer token')
+
+    def test_concurrency_is_bounded(self):
+        with FakeDispatchAPI() as api:
+            api.release.clear()
+            threading.Timer(0.3, api.release.set).start()
+            bd.bulk_dispatch(
+                [extension(f'BAPP-{i}') for i in range(6)], 'token',
+                concurrency=2, pacer=self.pacer, api_url=api.url)
+        self.assertEqual(api.max_in_flight, 2)
+
+    def test_throttled_dispatch_is_retried(self):
+        responses = {'BAPP-1': [(429, {'Retry-After': '0'})]}
+        with FakeDispatchAPI(responses) as api:
+            counts = bd.bulk_dispatch([extension('BAPP-1')], 'token', pacer=self.pacer, api_url=api.url)
+        self.assertEqual(counts['accepted'], 1)
+        self.assertEqual(api.keys(), ['BAPP-1', 'BAPP-1'])
+
+    def test_secondary_rate_limit_403_is_throttling(self):
+        responses = {'BAPP-1': [(403, {'Retry-After': '0'})] * (bd.MAX_THROTTLE_RETRIES + 1)}
+        with FakeDispatchAPI(responses) as api:
+            counts = bd.bulk_dispatch([extension('BAPP-1')], 'token', pacer=self.pacer, api_url=api.url)
+        self.assertEqual(counts['throttled'], 1)
+        self.assertEqual(len(api.received), bd.MAX_THROTTLE_RETRIES + 1)
+
+    def test_rejected_dispatch_is_failed(self):
+        responses = {'BAPP-2': [(422, {})]}
+        with FakeDispatchAPI(responses) as api:
+            counts = bd.bulk_dispatch(
+                [extension('BAPP-1'), extension('BAPP-2')], 'token', pacer=self.pacer, api_url=api.url)
+        self.assertEqual(counts, {'accepted': 1, 'failed': 1, 'throttled': 0, 'unknown': 0, 'skipped': 0})
+
+    def test_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'checkpoint.txt')
+            responses = {'BAPP-2': [(500, {})]}
+            extensions = [extension('BAPP-1'), extension('BAPP-2'), extension('BAPP-3')]
+
+            with FakeDispatchAPI(responses) as api:
+                first = bd.bulk_dispatch(
+                    extensions, 'token', checkpoint=bd.Checkpoint(path), pacer=self.pacer, api_url=api.url)
+                second = bd.bulk_dispatch(
+                    extensions, 'token', checkpoint=bd.Checkpoint(path), pacer=self.pacer, api_url=api.url)
+
+        self.assertEqual(first, {'accepted': 2, 'failed': 1, 'throttled': 0, 'unknown': 0, 'skipped': 0})
+        self.assertEqual(second, {'accepted': 1, 'failed': 0, 'throttled': 0, 'unknown': 0, 'skipped': 2})
+        self.assertEqual(api.keys().count('BAPP-2'), 2)
+        self.assertEqual(api.keys().count('BAPP-1'), 1)
+
+
+    def test_unanswered_dispatch_is_unknown_and_not_redispatched(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'checkpoint.txt')
+            extensions = [extension('BAPP-1')]
+            with mock.patch.object(bd, 'dispatch', side_effect=bd.DispatchUnknown('timed out')) as dispatch:
+                first = bd.bulk_dispatch(extensions, 'token', checkpoint=bd.Checkpoint(path), pacer=self.pacer)
+                second = bd.bulk_dispatch(extensions, 'token', checkpoint=bd.Checkpoint(path), pacer=self.pacer)
+
+        self.assertEqual(first, {'accepted': 0, 'failed': 0, 'throttled': 0, 'unknown': 1, 'skipped': 0})
+        self.assertEqual(second['skipped'], 1)
+        self.assertEqual(dispatch.call_count, 1)
+
+
+class DispatchTests(unittest.TestCase):
+    def test_stalled_dispatch_times_out_as_unknown(self):
+        with FakeDispatchAPI() as api:
+            api.release.clear()
+            with self.assertRaises(bd.DispatchUnknown) as ctx:
+                bd.dispatch(extension('BAPP-1'), 'token', api_url=api.url, timeout=0.1)
+            api.release.set()
+        self.assertIn('may have been accepted', str(ctx.exception))
+
+    def test_unreachable_api_is_failed(self):
+        with FakeDispatchAPI() as api:
+            url = api.url
+        with self.assertRaises(ValueError) as ctx:
+            bd.dispatch(extension('BAPP-1'), 'token', api_url=url, timeout=1)
+        self.assertNotIsInstance(ctx.exception, bd.DispatchUnknown)
+        self.assertIn('GitHub API request failed', str(ctx.exception))
+
+
+class MainTests(unittest.TestCase):
+    @mock.patch('bulk_dispatch.set_output')
+    @mock.patch.dict('os.environ', {}, clear=True)
+    def test_missing_configuration(self, mock_set_output):
+        with self.assertRaises(SystemExit) as cm:
+            with mock.patch('sys.stderr', new=StringIO()):
+                bd.main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(mock_set_output.call_args.args[0], 'error_message')
+
+    @mock.patch('bulk_dispatch.write_step_summary')
+    @mock.patch('bulk_dispatch.set_output')
+    @mock.patch('bulk_dispatch.bulk_dispatch')
+    def test_reports_counts(self, mock_bulk, mock_set_output, mock_summary):
+        mock_bulk.return_value = {'accepted': 3, 'failed': 0, 'throttled': 0, 'unknown': 0, 'skipped': 1}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'extensions.json')
+            with open(path, 'w') as f:
+                json.dump([extension('BAPP-1')], f)
+            with mock.patch.dict('os.environ', {'EXTENSIONS_FILE': path, 'GH_TOKEN': 'token'}, clear=True):
+                bd.main()
+
+        mock_set_output.assert_any_call('accepted', 3)
+        self.assertIn('| skipped | 1 |', mock_summary.call_args.args[0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
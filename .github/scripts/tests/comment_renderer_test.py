@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+"""
+Tests for comment_renderer.py
+Run with: python comment_renderer_test.py
+
+Rendering uses the real comment templates; the GitHub API is mocked so the
+tests need no network.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from urllib.error import HTTPError, URLError
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import comment_renderer as cr
+
+
+def created_comment(url):
+    response = mock.MagicMock()
+    response.read.return_value = json.dumps({'html_url': url}).encode()
+    response.__enter__.return_value = response
+    return response
+
+
+class EscapeMarkdownTests(unittest.TestCase):
+    def test_escapes_special_characters(self):
+        self.assertEqual(cr.escape_markdown('a*b_c`d[e]f'), 'a\\*b\\_c\\`d\\[e\\]f')
+
+    def test_escapes_backslashes_first(self):
+        self.assertEqual(cr.escape_markdown('C:\\path\\*'), 'C:\\\\path\\\\\\*')
+
+    def test_plain_text_unchanged(self):
+        self.assertEqual(cr.escape_markdown('Repository not found: owner/repo'),
+                         'Repository not found: owner/repo')
+
+
+class CompileTemplateTests(unittest.TestCase):
+    def test_joins_lines_and_substitutes(self):
+        render = cr.compile_template('t.k', ['**Error:** {{ERROR_MESSAGE}}', '', 'Bye {{ERROR_MESSAGE}}'])
+        self.assertEqual(render({'ERROR_MESSAGE': 'x_y'}), '**Error:** x\\_y\n\nBye x\\_y')
+
+    def test_missing_value_renders_empty(self):
+        render = cr.compile_template('t.k', ['[{{ERROR_MESSAGE}}]'])
+        self.assertEqual(render({}), '[]')
+
+    def test_unknown_placeholder_rejected_at_compile_time(self):
+        with self.assertRaises(ValueError) as ctx:
+            cr.compile_template('t.k', ['Hi {{GITHUB_TOKEN}}'])
+        self.assertIn('t.k uses unknown placeholders: GITHUB_TOKEN', str(ctx.exception))
+
+
+class RenderTests(unittest.TestCase):
+    def test_every_shipped_template_compiles(self):
+        renderers = cr.load_renderers()
+        self.assertIn('extension-submission.success', renderers)
+        self.assertIn('reopen-issue.archived', renderers)
+
+    def test_failure_specific_escapes_error(self):
+        body = cr.render('extension-submission.failure-specific', {'ERROR_MESSAGE': 'Repo *owner/my_repo* not found'})
+        self.assertIn('**Error:** Repo \\*owner/my\\_repo\\* not found\n', body)
+        self.assertTrue(body.startswith('❌ Submission failed.\n\n'))
+
+    def test_unknown_template(self):
+        with self.assertRaises(ValueError) as ctx:
+            cr.render('extension-submission.missing')
+        self.assertIn('Template not found: extension-submission.missing', str(ctx.exception))
+
+    def test_templates_loaded_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'templates.json')
+            with open(path, 'w') as f:
+                json.dump({'a': {'b': ['one']}}, f)
+            self.assertEqual(cr.render('a.b', path=path), 'one')
+            with open(path, 'w') as f:
+                json.dump({'a': {'b': ['two']}}, f)
+            self.assertEqual(cr.render('a.b', path=path), 'one')
+
+
+class PostCommentsTests(unittest.TestCase):
+    @mock.patch('comment_renderer.request.urlopen')
+    def test_posts_each_comment(self, mock_urlopen):
+        mock_urlopen.side_effect = [created_comment('https://github.com/c/1'), created_comment('https://github.com/c/2')]
+
+        urls = cr.post_comments('PortSwigger/extension-portal', 5, [
+            ('update-submission.manual', {}),
+            ('extension-submission.failure-specific', {'ERROR_MESSAGE': 'bad'}),
+        ], 'test_token')
+
+        self.assertEqual(urls, ['https://github.com/c/1', 'https://github.com/c/2'])
+        first, second = [call.args[0] for call in mock_urlopen.call_args_list]
+        self.assertEqual(first.full_url, 'https://api.github.com/repos/PortSwigger/extension-portal/issues/5/comments')
+        self.assertEqual(first.get_header('Authorization'), 'token test_token')
+        self.assertEqual(json.loads(second.data)['body'], cr.render('extension-submission.failure-specific', {'ERROR_MESSAGE': 'bad'}))
+
+    @mock.patch('comment_renderer.request.urlopen')
+    def test_bad_template_posts_nothing(self, mock_urlopen):
+        with self.assertRaises(ValueError):
+            cr.post_comments('PortSwigger/extension-portal', 5, [
+                ('extension-submission.success', {}),
+                ('nope.nope', {}),
+            ], 'test_token')
+        mock_urlopen.assert_not_called()
+
+    @mock.patch('comment_renderer.request.urlopen')
+    def test_http_error(self, mock_urlopen):
+        mock_urlopen.side_effect = HTTPError('url', 403, 'Forbidden', {}, None)
+        with self.assertRaises(ValueError) as ctx:
+            cr.post_comment('PortSwigger/extension-portal', 5, 'body', 'test_token')
+        self.assertIn('403', str(ctx.exception))
+
+    @mock.patch('comment_renderer.request.urlopen')
+    def test_network_errors(self, mock_urlopen):
+        for failure, message in [
+            (URLError(ConnectionRefusedError('refused')), 'GitHub API request failed'),
+            (TimeoutError('timed out'), 'the comment may have been posted'),
+        ]:
+            with self.subTest(failure=failure):
+                mock_urlopen.side_effect = failure
+                with self.assertRaises(ValueError) as ctx:
+                    cr.post_comment('PortSwigger/extension-portal', 5, 'body', 'test_token')
+                self.assertIn(message, str(ctx.exception))
+        self.assertEqual(mock_urlopen.call_args.kwargs['timeout'], cr.POST_TIMEOUT)
+
+    @mock.patch('comment_renderer.request.urlopen')
+    def test_partial_failure_lists_posted_comments(self, mock_urlopen):
+        mock_urlopen.side_effect = [created_comment('https://github.com/c/1'),
+                                    HTTPError('url', 502, 'Bad Gateway', {}, None)]
+        with mock.patch('sys.stderr', new=StringIO()) as stderr:
+            with self.assertRaises(ValueError):
+                cr.post_comments('PortSwigger/extension-portal', 5, [
+                    ('update-submission.manual', {}),
+                    ('extension-submission.success', {}),
+                ], 'test_token')
+        self.assertIn('1 of 2 comment(s) were posted before the failure: https://github.com/c/1', stderr.getvalue())
+
+
+class MainTests(unittest.TestCase):
+    @mock.patch('comment_renderer.post_comments')
+    def test_posts_comma_separated_templates(self, mock_post):
+        mock_post.return_value = ['u1', 'u2']
+        env = {
+            'GITHUB_REPOSITORY': 'PortSwigger/extension-portal',
+            'ISSUE_NUMBER': '9',
+            'TEMPLATE_KEY': 'reopen-issue.reopened, extension-submission.failure-specific',
+            'ERROR_MESSAGE': 'oops',
+            'GITHUB_TOKEN': 'test_token',
+        }
+        with mock.patch.dict('os.environ', env, clear=True), mock.patch('sys.stdout', new=StringIO()):
+            cr.main()
+
+        mock_post.assert_called_once_with('PortSwigger/extension-portal', '9', [
+            ('reopen-issue.reopened', {'ERROR_MESSAGE': 'oops'}),
+            ('extension-submission.failure-specific', {'ERROR_MESSAGE': 'oops'}),
+        ], 'test_token')
+
+    @mock.patch('comment_renderer.set_output')
+    @mock.patch.dict('os.environ', {'GITHUB_REPOSITORY': 'PortSwigger/extension-portal'}, clear=True)
+    def test_missing_configuration(self, mock_set_output):
+        with self.assertRaises(SystemExit) as cm:
+            with mock.patch('sys.stderr', new=StringIO()):
+                cr.main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(mock_set_output.call_args.args[0], 'error_message')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
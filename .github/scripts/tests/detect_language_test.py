@@ -11,7 +11,7 @@ import unittest
 from io import StringIO
 from pathlib import Path
 from unittest.mock import patch, MagicMock, mock_open
-from urllib.error import HTTPError
+from urllib.error import HTTPError, URLError
 
 # Add parent directory to path to import the module
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -219,6 +219,164 @@ class TestDetectLanguage(unittest.TestCase):
         mock_fetch.assert_called_once_with('owner', 'repo', 'test_token')
 
 
+class TestBuildLanguagesQuery(unittest.TestCase):
+    """Tests for build_languages_query function."""
+
+    def test_one_alias_per_repository(self):
+        query = detect_language.build_languages_query(3, first=10)
+        self.assertIn('query($o0: String!, $n0: String!, $o1: String!', query)
+        self.assertIn('r2: repository(owner: $o2, name: $n2)', query)
+        self.assertIn('languages(first: 10)', query)
+        self.assertNotIn('r3:', query)
+
+
+def graphql_response(payload):
+    """Build a mock urlopen response returning a GraphQL payload."""
+    mock_response = MagicMock()
+    mock_response.read.return_value = json.dumps(payload).encode()
+    mock_response.__enter__.return_value = mock_response
+    return mock_response
+
+
+def languages_node(**sizes):
+    return {'languages': {'edges': [
+        {'size': size, 'node': {'name': name}} for name, size in sizes.items()
+    ]}}
+
+
+class TestFetchLanguagesBatch(unittest.TestCase):
+    """Tests for fetch_languages_batch function."""
+
+    @patch('detect_language.request.urlopen')
+    def test_variables_and_results(self, mock_urlopen):
+        mock_urlopen.return_value = graphql_response({'data': {
+            'r0': languages_node(Java=100, HTML=5),
+            'r1': languages_node(Python=50),
+        }})
+
+        results = detect_language.fetch_languages_batch([('a', 'one'), ('b', 'two')], 'test_token')
+
+        self.assertEqual(results, [{'Java': 100, 'HTML': 5}, {'Python': 50}])
+        req = mock_urlopen.call_args.args[0]
+        body = json.loads(req.data)
+        self.assertEqual(body['variables'], {'o0': 'a', 'n0': 'one', 'o1': 'b', 'n1': 'two'})
+        self.assertEqual(req.get_header('Authorization'), 'bearer test_token')
+
+    @patch('detect_language.request.urlopen')
+    def test_per_alias_error_does_not_fail_batch(self, mock_urlopen):
+        mock_urlopen.return_value = graphql_response({
+            'data': {'r0': None, 'r1': languages_node(Ruby=10)},
+            'errors': [{'type': 'NOT_FOUND', 'path': ['r0'],
+                        'message': "Could not resolve to a Repository with the name 'a/gone'."}],
+        })
+
+        gone, ruby = detect_language.fetch_languages_batch([('a', 'gone'), ('b', 'ruby')], 'test_token')
+
+        self.assertIsInstance(gone, ValueError)
+        self.assertIn('GitHub repository not found: a/gone', str(gone))
+        self.assertIn('Could not resolve', str(gone))
+        self.assertEqual(ruby, {'Ruby': 10})
+
+    @patch('detect_language.request.urlopen')
+    def test_whole_query_error(self, mock_urlopen):
+        mock_urlopen.return_value = graphql_response({'errors': [{'message': 'Bad credentials'}]})
+
+        with self.assertRaises(ValueError) as cm:
+            detect_language.fetch_languages_batch([('a', 'one')], 'bad_token')
+        self.assertIn('Bad credentials', str(cm.exception))
+
+    @patch('detect_language.request.urlopen')
+    def test_http_error(self, mock_urlopen):
+        mock_urlopen.side_effect = HTTPError('url', 502, 'Bad Gateway', {}, None)
+
+        with self.assertRaises(ValueError) as cm:
+            detect_language.fetch_languages_batch([('a', 'one')], 'test_token')
+        self.assertIn('502', str(cm.exception))
+
+    @patch('detect_language.request.urlopen')
+    def test_timeout(self, mock_urlopen):
+        mock_urlopen.side_effect = URLError(TimeoutError('timed out'))
+
+        with self.assertRaises(ValueError) as cm:
+            detect_language.fetch_languages_batch([('a', 'one')], 'test_token', timeout=5)
+        self.assertIn('GitHub API request failed: timed out', str(cm.exception))
+        self.assertEqual(mock_urlopen.call_args.kwargs['timeout'], 5)
+
+    @patch('detect_language.request.urlopen')
+    def test_other_alias_errors_are_not_reported_as_not_found(self, mock_urlopen):
+        mock_urlopen.return_value = graphql_response({
+            'data': {'r0': None},
+            'errors': [{'type': 'FORBIDDEN', 'path': ['r0'],
+                        'message': 'Resource protected by organization SAML enforcement.'}],
+        })
+
+        result, = detect_language.fetch_languages_batch([('a', 'sso')], 'test_token')
+
+        self.assertEqual(str(result), 'GitHub GraphQL error for a/sso: FORBIDDEN: '
+                                      'Resource protected by organization SAML enforcement.')
+
+
+class TestDetectLanguagesBatch(unittest.TestCase):
+    """Tests for detect_languages_batch function."""
+
+    @patch('detect_language.fetch_languages_batch')
+    def test_streams_results_in_batches(self, mock_fetch):
+        mock_fetch.side_effect = [
+            [{'Kotlin': 90, 'Java': 10}, ValueError('GitHub repository not found: o/gone (not found)')],
+            [{'JavaScript': 100}],
+        ]
+        urls = [
+            'https://github.com/o/kotlin',
+            'not-a-github-url',
+            'https://github.com/o/gone',
+            'https://github.com/o/js',
+        ]
+
+        results = list(detect_language.detect_languages_batch(urls, 'test_token', batch_size=2))
+
+        self.assertEqual(results[0], ('not-a-github-url', None, 'Could not extract owner/repo from URL: not-a-github-url'))
+        self.assertEqual(results[1], ('https://github.com/o/kotlin', 'Java', None))
+        self.assertEqual(results[2][:2], ('https://github.com/o/gone', None))
+        self.assertIn('not found', results[2][2])
+        self.assertEqual(results[3], ('https://github.com/o/js', 'Unknown', None))
+        self.assertEqual(
+            [call.args[0] for call in mock_fetch.call_args_list],
+            [[('o', 'kotlin'), ('o', 'gone')], [('o', 'js')]],
+        )
+
+    @patch('detect_language.fetch_languages_batch')
+    def test_failed_batch_is_retried(self, mock_fetch):
+        mock_fetch.side_effect = [ValueError('GitHub API error: 502 Bad Gateway'), [{'Ruby': 10}]]
+        sleeps = []
+
+        with patch('sys.stderr', new=StringIO()):
+            results = list(detect_language.detect_languages_batch(
+                ['https://github.com/o/ruby'], 'test_token', sleep=sleeps.append))
+
+        self.assertEqual(results, [('https://github.com/o/ruby', 'Ruby', None)])
+        self.assertEqual(sleeps, [detect_language.BATCH_BACKOFF])
+
+    @patch('detect_language.fetch_languages_batch')
+    def test_failing_batch_does_not_abort_the_run(self, mock_fetch):
+        failure = ValueError('GitHub API error: 403 secondary rate limit')
+        mock_fetch.side_effect = [failure] * detect_language.BATCH_ATTEMPTS + [[{'Java': 1}]]
+        urls = ['https://github.com/o/a', 'https://github.com/o/b', 'https://github.com/o/c']
+
+        with patch('sys.stderr', new=StringIO()):
+            results = list(detect_language.detect_languages_batch(urls, 'test_token', batch_size=2, sleep=lambda _: None))
+
+        self.assertEqual(results, [
+            ('https://github.com/o/a', None, str(failure)),
+            ('https://github.com/o/b', None, str(failure)),
+            ('https://github.com/o/c', 'Java', None),
+        ])
+
+    @patch('detect_language.fetch_languages_batch')
+    def test_no_urls(self, mock_fetch):
+        self.assertEqual(list(detect_language.detect_languages_batch([], 'test_token')), [])
+        mock_fetch.assert_not_called()
+
+
 class TestMain(unittest.TestCase):
     """Tests for main function."""
 
@@ -284,6 +442,52 @@ class TestMain(unittest.TestCase):
         self.assertEqual(cm.exception.code, 1)
         mock_set_output.assert_called_once_with('error_message', 'GitHub repository not found: owner/repo')
 
+    @patch('detect_language.write_step_summary')
+    @patch('detect_language.detect_languages_batch')
+    def test_main_batch_mode(self, mock_batch, mock_summary):
+        mock_batch.return_value = iter([
+            ('https://github.com/o/a', 'Java', None),
+            ('https://github.com/o/b', 'Java', None),
+            ('https://github.com/o/gone', None, 'GitHub repository not found: o/gone (not found)'),
+        ])
+
+        with patch('builtins.open', mock_open(read_data='https://github.com/o/a\n\nhttps://github.com/o/b\n')):
+            with patch.dict('os.environ', {'URLS_FILE': 'urls.txt', 'GITHUB_TOKEN': 'test_token'}, clear=True):
+                with patch('sys.stdout', new=StringIO()) as stdout:
+                    detect_language.main()
+
+        mock_batch.assert_called_once_with(['https://github.com/o/a', 'https://github.com/o/b'], 'test_token')
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(lines[0], {'url': 'https://github.com/o/a', 'language': 'Java', 'error': None})
+        summary = mock_summary.call_args.args[0]
+        self.assertIn('| Java | 2 |', summary)
+        self.assertIn('| Error | 1 |', summary)
+
+    @patch('detect_language.set_output')
+    @patch.dict('os.environ', {'URLS_FILE': 'urls.txt'}, clear=True)
+    def test_main_batch_mode_without_token(self, mock_set_output):
+        with self.assertRaises(SystemExit) as cm:
+            with patch('sys.stderr', new=StringIO()):
+                detect_language.main()
+
+        self.assertEqual(cm.exception.code, 1)
+        mock_set_output.assert_called_once_with(
+            'error_message', 'GITHUB_TOKEN is required for batch language detection'
+        )
+
+    @patch('detect_language.set_output')
+    @patch.dict('os.environ', {'URLS_FILE': '/nonexistent/urls.txt', 'GITHUB_TOKEN': 'test_token'}, clear=True)
+    def test_main_batch_mode_missing_file(self, mock_set_output):
+        with self.assertRaises(SystemExit) as cm:
+            with patch('sys.stderr', new=StringIO()) as stderr:
+                detect_language.main()
+
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn('::error::', stderr.getvalue())
+        key, value = mock_set_output.call_args.args
+        self.assertEqual(key, 'error_message')
+        self.assertIn('/nonexistent/urls.txt', value)
+
 
 def run_tests():
     """Run all tests."""
@@ -294,6 +498,9 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestExtractOwnerRepo))
     suite.addTests(loader.loadTestsFromTestCase(TestFetchLanguages))
     suite.addTests(loader.loadTestsFromTestCase(TestDetectLanguage))
+    suite.addTests(loader.loadTestsFromTestCase(TestBuildLanguagesQuery))
+    suite.addTests(loader.loadTestsFromTestCase(TestFetchLanguagesBatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestDetectLanguagesBatch))
     suite.addTests(loader.loadTestsFromTestCase(TestMain))
 
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""
+Test doubles shared by the script tests.
+
+Not a test module itself; the tests import it from their own directory.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Request handler that keeps the test output free of access logs."""
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """
+    Serve a request handler on a local HTTP server for the length of a with block.
+
+    Args:
+        handler: BaseHTTPRequestHandler subclass
+        threaded: Handle requests concurrently (for tests with slow responses)
+    """
+
+    def __init__(self, handler, threaded=False):
+        self.server = (ThreadingHTTPServer if threaded else HTTPServer)(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        # A short poll interval keeps shutdown() from adding half a second per test.
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeClock:
+    """A clock that only moves when told to, or when something sleeps on it."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+"""
+Micro-benchmark for fingerprint.py
+Run with: python fingerprint_benchmark.py [extensions]
+
+Times loading a fingerprint index of random signatures and querying it,
+and computing a signature from a large set of shingles.
+Not collected by the test suite.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+# Make the module under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fingerprint as fp
+
+
+def main(count=5000):
+    rng = random.Random(0)
+    signature = [rng.getrandbits(61) for _ in range(fp.NUM_PERM)]
+    shingles = {rng.getrandbits(32) for _ in range(20000)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'fingerprints.json')
+        index = fp.FingerprintIndex(path)
+        for i in range(count):
+            index.add(f'Extension {i}', [rng.getrandbits(61) for _ in range(fp.NUM_PERM)])
+        index.add('Original', signature)
+        index.save()
+
+        cases = [
+            ('load index', lambda: fp.FingerprintIndex(path)),
+            ('query', lambda: index.query(signature)),
+            ('load and query', lambda: fp.FingerprintIndex(path).query(signature)),
+            (f'minhash, {len(shingles)} shingles', lambda: fp.minhash(shingles)),
+        ]
+        print(f'{count} extensions, best of 5')
+        for name, case in cases:
+            seconds = min(timeit.repeat(case, number=1, repeat=5))
+            print(f'  {name:<26} {seconds * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
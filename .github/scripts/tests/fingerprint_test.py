@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+"""
+Tests for fingerprint.py
+Run with: python fingerprint_test.py
+
+Source trees are built in memory and streamed through the inspector as
+tarballs; fetching from GitHub is mocked so the tests need no network.
+"""
+
+import io
+import json
+import os
+import random
+import sys
+import tarfile
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fingerprint as fp
+from stream_tarball import inspect_stream
+
+
+def build_tarball(files, prefix='owner-repo-abc123'):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for path, content in files.items():
+            info = tarfile.TarInfo(f'{prefix}/{path}')
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    buffer.seek(0)
+    return buffer
+
+
+def java_source(class_name, methods):
+    """Generate a Java extension with distinct method bodies."""
+    body = '\n'.join(
+        f'    public int handler{i}(int value) {{\n'
+        f'        int result = value * {i} + {i * 7};\n'
+        f'        log("handled request {i}", result);\n'
+        f'        return result - {i % 5};\n'
+        f'    }}\n'
+        for i in methods
+    )
+    return (f'package burp.example;\n\nimport burp.api.montoya.MontoyaApi;\n\n'
+            f'public class {class_name} {{\n{body}}}\n').encode()
+
+
+def signature_of(files):
+    inspector = fp.FingerprintInspector()
+    inspect_stream(build_tarball(files), [inspector])
+    return inspector.result()
+
+
+class TokenizeTests(unittest.TestCase):
+    def test_comments_and_imports_dropped(self):
+        tokens = fp.source_tokens(b'// Licensed under Apache\nimport burp.api.X;\n/* doc */ int x = 1; # not a comment\n', '.java')
+        self.assertEqual(tokens, [b'int', b'x', b'=', b'1', b';', b'#', b'not', b'a', b'comment'])
+
+    def test_hash_comments(self):
+        self.assertEqual(fp.source_tokens(b'from burp import IBurpExtender\nx = 1  # set x\n', '.py'),
+                         [b'x', b'=', b'1'])
+
+    def test_shingles(self):
+        tokens = [bytes([c]) for c in b'abcdefghij']
+        self.assertEqual(len(fp.shingle_hashes(tokens, size=7)), 4)
+        self.assertEqual(len(fp.shingle_hashes(tokens[:3], size=7)), 1)
+        self.assertEqual(fp.shingle_hashes([]), set())
+
+
+class SignatureTests(unittest.TestCase):
+    def test_estimates_jaccard_similarity(self):
+        a = set(range(0, 1000))
+        b = set(range(500, 1500))
+        estimate = fp.similarity(fp.minhash(a), fp.minhash(b))
+        self.assertAlmostEqual(estimate, 1 / 3, delta=0.12)
+
+    def test_renamed_copy_matches(self):
+        original = signature_of({'src/main/java/Scanner.java': java_source('Scanner', range(40)), 'pom.xml': b'<project/>'})
+        renamed = signature_of({'Renamed.java': java_source('Scanner', range(40)), 'README.md': b'# New name'})
+        self.assertEqual(fp.similarity(original, renamed), 1.0)
+
+    def test_lightly_edited_copy_is_similar(self):
+        original = signature_of({'A.java': java_source('A', range(40))})
+        edited = signature_of({'A.java': java_source('A', range(4, 44))})
+        unrelated = signature_of({'B.java': java_source('B', range(1000, 1040))})
+        self.assertGreater(fp.similarity(original, edited), 0.7)
+        self.assertLess(fp.similarity(original, unrelated), 0.2)
+
+    def test_skips_non_source_and_oversized_files(self):
+        inspector = fp.FingerprintInspector()
+        self.assertFalse(inspector.start('README.md', 100))
+        self.assertFalse(inspector.start('Big.java', fp.MAX_FILE_SIZE + 1))
+        self.assertTrue(inspector.start('Small.java', 100))
+
+    def test_no_sources(self):
+        with self.assertRaises(ValueError) as ctx:
+            signature_of({'README.md': b'hello'})
+        self.assertIn('No source files found', str(ctx.exception))
+
+
+class FingerprintIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'index', 'fingerprints.json')
+        self.original = signature_of({'A.java': java_source('A', range(40))})
+        self.edited = signature_of({'A.java': java_source('A', range(4, 44))})
+        self.unrelated = signature_of({'B.java': java_source('B', range(1000, 1040))})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_query_returns_similar_extensions(self):
+        index = fp.FingerprintIndex(self.path)
+        index.add('Original', self.original)
+        index.add('Unrelated', self.unrelated)
+
+        matches = index.query(self.edited)
+        self.assertEqual([name for name, _ in matches], ['Original'])
+        self.assertEqual(index.query(self.original)[0], ('Original', 1.0))
+
+    def test_incremental_add_persists(self):
+        index = fp.FingerprintIndex(self.path)
+        index.add('Original', self.original)
+        index.save()
+
+        index = fp.FingerprintIndex(self.path)
+        self.assertEqual(index.query(self.unrelated), [])
+        index.add('Unrelated', self.unrelated)
+        index.save()
+
+        index = fp.FingerprintIndex(self.path)
+        self.assertEqual(sorted(index.signatures), ['Original', 'Unrelated'])
+        self.assertEqual(index.query(self.unrelated)[0][0], 'Unrelated')
+
+    def test_re_adding_replaces_signature(self):
+        index = fp.FingerprintIndex(self.path)
+        index.add('Extension', self.original)
+        index.add('Extension', self.unrelated)
+        self.assertEqual(index.query(self.original), [])
+        self.assertEqual(list(index.signatures), ['Extension'])
+
+    def test_reads_index_of_unpacked_signatures(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            json.dump({'num_perm': fp.NUM_PERM, 'bands': fp.BANDS, 'seed': fp.SEED,
+                       'signatures': {'Original': self.original}}, f)
+        index = fp.FingerprintIndex(self.path)
+        self.assertEqual(fp.unpack(index.signatures['Original']), self.original)
+        self.assertEqual(index.query(self.original), [('Original', 1.0)])
+
+    def test_rejects_index_with_other_parameters(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            json.dump({'num_perm': 64, 'bands': 16, 'seed': 1, 'signatures': {}}, f)
+        with self.assertRaises(ValueError):
+            fp.FingerprintIndex(self.path)
+
+    def test_query_compares_only_band_candidates(self):
+        # Timings are in fingerprint_benchmark.py; here, only extensions
+        # sharing a band with the query may be compared with it.
+        rng = random.Random(0)
+        index = fp.FingerprintIndex(self.path)
+        for i in range(5000):
+            index.add(f'Extension {i}', [rng.getrandbits(61) for _ in range(fp.NUM_PERM)])
+        index.add('Original', self.original)
+        index.save()
+
+        index = fp.FingerprintIndex(self.path)
+        with mock.patch.object(fp, 'similarity', wraps=fp.similarity) as similarity:
+            matches = index.query(self.edited)
+
+        self.assertEqual([name for name, _ in matches], ['Original'])
+        self.assertEqual(similarity.call_count, 1)
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'fingerprints.json')
+        self.signature = signature_of({'A.java': java_source('A', range(40))})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, **env):
+        env = {'FINGERPRINT_INDEX': self.path, 'REPO_URL': 'https://github.com/someone/copied-bapp', **env}
+        with mock.patch.dict('os.environ', env, clear=True), \
+                mock.patch('fingerprint.fingerprint_repository', return_value=self.signature) as mock_fingerprint, \
+                mock.patch('fingerprint.set_output') as mock_set_output, \
+                mock.patch('sys.stdout', new=StringIO()), mock.patch('sys.stderr', new=StringIO()):
+            fp.main()
+        return mock_fingerprint, {call.args[0]: call.args[1] for call in mock_set_output.call_args_list}
+
+    def test_add_then_check(self):
+        mock_fingerprint, _ = self.run_main(MODE='add', EXTENSION_NAME='Original BApp')
+        mock_fingerprint.assert_called_once_with('someone', 'copied-bapp', 'HEAD', None)
+
+        _, outputs = self.run_main()
+        self.assertEqual(outputs['is_near_duplicate'], 'true')
+        self.assertEqual(json.loads(outputs['near_duplicates']), [{'name': 'Original BApp', 'similarity': 1.0}])
+
+    def test_check_against_empty_index(self):
+        _, outputs = self.run_main()
+        self.assertEqual(outputs, {'near_duplicates': '[]', 'is_near_duplicate': 'false'})
+
+    @mock.patch('fingerprint.set_output')
+    @mock.patch.dict('os.environ', {'MODE': 'add', 'REPO_URL': 'https://github.com/o/r'}, clear=True)
+    def test_add_requires_name(self, mock_set_output):
+        with self.assertRaises(SystemExit) as cm:
+            with mock.patch('sys.stderr', new=StringIO()):
+                fp.main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(mock_set_output.call_args.args[0], 'error_message')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
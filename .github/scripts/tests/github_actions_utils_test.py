@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""
+Tests for github_actions_utils.py
+Run with: python github_actions_utils_test.py
+"""
+
+import os
+import pstats
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+# Make the module under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import github_actions_utils as gau
+
+
+def busy_main():
+    """A main function with some CPU work and allocations to profile."""
+    data = [str(i) * 10 for i in range(20000)]
+    return len(data)
+
+
+class SetOutputTests(unittest.TestCase):
+    def test_writes_heredoc_to_github_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'output')
+            with mock.patch.dict('os.environ', {'GITHUB_OUTPUT': path}):
+                gau.set_output('error_message', 'line one\nline=two')
+            with open(path) as f:
+                lines = f.read().splitlines()
+        self.assertTrue(lines[0].startswith('error_message<<ghadelimiter_'))
+        self.assertEqual(lines[1:3], ['line one', 'line=two'])
+        self.assertEqual(lines[3], lines[0].split('<<')[1])
+
+
+class WriteStepSummaryTests(unittest.TestCase):
+    def test_appends_to_step_summary(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'summary.md')
+            with mock.patch.dict('os.environ', {'GITHUB_STEP_SUMMARY': path}):
+                gau.write_step_summary('# One')
+                gau.write_step_summary('# Two')
+            with open(path) as f:
+                self.assertEqual(f.read(), '# One\n# Two\n')
+
+    @mock.patch.dict('os.environ', {}, clear=True)
+    def test_prints_locally(self):
+        with mock.patch('sys.stdout', new=StringIO()) as stdout:
+            gau.write_step_summary('# Local')
+        self.assertEqual(stdout.getvalue(), '# Local\n')
+
+
+class ProfiledTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.summary = os.path.join(self.tmp.name, 'summary.md')
+        self.reports = Path(self.tmp.name, 'reports')
+
+    def profile(self, mode, main=busy_main):
+        env = {'PORTAL_PROFILE': mode, 'PORTAL_PROFILE_DIR': str(self.reports),
+               'GITHUB_STEP_SUMMARY': self.summary}
+        with mock.patch.dict('os.environ', env, clear=True), \
+                mock.patch.object(sys, 'argv', ['/scripts/validate_repo.py']):
+            return gau.profiled(main)()
+
+    def summary_text(self):
+        with open(self.summary) as f:
+            return f.read()
+
+    @mock.patch.dict('os.environ', {}, clear=True)
+    def test_unset_returns_main_unchanged(self):
+        self.assertIs(gau.profiled(busy_main), busy_main)
+
+    def test_unknown_mode_returns_main_unchanged(self):
+        with mock.patch.dict('os.environ', {'PORTAL_PROFILE': 'gpu'}, clear=True), \
+                mock.patch('sys.stderr', new=StringIO()):
+            self.assertIs(gau.profiled(busy_main), busy_main)
+
+    def test_cpu_profile(self):
+        self.assertEqual(self.profile('cpu'), 20000)
+
+        stats = pstats.Stats(str(self.reports / 'validate_repo.pstats'))
+        self.assertTrue(any(name == 'busy_main' for _, _, name in stats.stats))
+        self.assertTrue((self.reports / 'validate_repo-cpu.txt').exists())
+        self.assertFalse((self.reports / 'validate_repo-mem.txt').exists())
+        self.assertIn('### CPU profile: validate_repo', self.summary_text())
+        self.assertIn('busy_main', self.summary_text())
+
+    def test_mem_profile(self):
+        self.profile('mem')
+
+        self.assertIn('github_actions_utils_test.py', (self.reports / 'validate_repo-mem.txt').read_text())
+        self.assertFalse((self.reports / 'validate_repo.pstats').exists())
+        self.assertIn('### Top allocations: validate_repo', self.summary_text())
+
+    def test_both_profiles_written_when_main_exits(self):
+        def failing_main():
+            busy_main()
+            sys.exit(1)
+
+        with self.assertRaises(SystemExit):
+            self.profile('both', failing_main)
+
+        self.assertTrue((self.reports / 'validate_repo.pstats').exists())
+        self.assertTrue((self.reports / 'validate_repo-mem.txt').exists())
+        self.assertIn('### CPU profile', self.summary_text())
+        self.assertIn('### Top allocations', self.summary_text())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
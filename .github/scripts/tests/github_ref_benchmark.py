@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""
+Micro-benchmark for github_ref.py
+Run with: python github_ref_benchmark.py [links]
+
+Times parsing a mix of link forms with the memoized parser, with the
+underlying uncached parser, and with the per-script regexes it replaced.
+Not collected by the test suite.
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Make the module under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import github_ref as gr
+
+
+FORMS = [
+    'https://github.com/owner{i}/repo{i}',
+    'https://github.com/owner{i}/repo{i}.git',
+    'git@github.com:owner{i}/repo{i}.git',
+    'https://github.com/owner{i}/repo{i}/tree/main',
+    'https://github.com/owner{i}/repo{i}/pull/{i}',
+    'https://github.com/owner{i}/repo{i}?tab=readme-ov-file',
+]
+
+# The patterns validate_repo/detect_language and resolve_source_repo used before github_ref.
+LEGACY_REPO_PATTERN = r'(?:https://)?(?:www\.)?github\.com/([^/]+)/([^/]+)'
+LEGACY_PULL_PATTERN = r'(?:https://)?(?:www\.)?github\.com/([A-Za-z0-9._-]+)/([A-Za-z0-9._-]+)/pull/(\d+)'
+
+
+def legacy_parse(url):
+    return re.match(LEGACY_PULL_PATTERN, url) or re.match(LEGACY_REPO_PATTERN, url)
+
+
+def main(count=10000):
+    links = [FORMS[i % len(FORMS)].format(i=i) for i in range(count)]
+    uncached = gr.parse.__wrapped__
+
+    def run(parser):
+        for link in links:
+            parser(link)
+
+    gr.parse.cache_clear()
+    cases = [
+        ('legacy regexes', lambda: run(legacy_parse)),
+        ('github_ref, uncached', lambda: run(uncached)),
+        ('github_ref, first parse', lambda: (gr.parse.cache_clear(), run(gr.parse))),
+        ('github_ref, memoized', lambda: run(gr.parse)),
+    ]
+    print(f'{count} links, best of 5')
+    for name, case in cases:
+        seconds = min(timeit.repeat(case, number=1, repeat=5))
+        print(f'  {name:<26} {seconds * 1000:8.1f} ms  {count / seconds:12,.0f} links/s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+"""
+Tests for github_ref.py
+Run with: python github_ref_test.py
+
+Also checks that every script parsing GitHub links agrees with github_ref
+on the same set of links.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Make the module under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import github_ref as gr
+import detect_language
+import fingerprint
+import idempotency
+import repo_identity
+import resolve_source_repo
+import validate_repo
+
+
+# Links to one repository, in every form the parser accepts.
+REPO_LINKS = [
+    'https://github.com/PortSwigger/Example-Ext',
+    'https://github.com/PortSwigger/Example-Ext/',
+    'https://github.com/PortSwigger/Example-Ext.git',
+    'https://github.com/PortSwigger/Example-Ext.git/',
+    'https://github.com/PortSwigger/Example-Ext.GIT',
+    'http://github.com/PortSwigger/Example-Ext',
+    'https://www.github.com/PortSwigger/Example-Ext',
+    'github.com/PortSwigger/Example-Ext',
+    'www.github.com/PortSwigger/Example-Ext',
+    'git@github.com:PortSwigger/Example-Ext.git',
+    'git@github.com:PortSwigger/Example-Ext.Git',
+    'ssh://git@github.com/PortSwigger/Example-Ext.git',
+    'https://github.com/PortSwigger/Example-Ext/tree/main',
+    'https://github.com/PortSwigger/Example-Ext/tree/feature/new-ui/',
+    'https://github.com/PortSwigger/Example-Ext/blob/main/README.md',
+    'https://github.com/PortSwigger/Example-Ext?tab=readme-ov-file',
+    'https://github.com/PortSwigger/Example-Ext#installation',
+    'https://github.com/PortSwigger/Example-Ext/issues/4',
+    '  https://github.com/PortSwigger/Example-Ext\n',
+]
+
+PULL_LINKS = [
+    'https://github.com/PortSwigger/Example-Ext/pull/42',
+    'https://github.com/PortSwigger/Example-Ext/pull/42/',
+    'https://github.com/PortSwigger/Example-Ext/pull/42/files',
+    'https://github.com/PortSwigger/Example-Ext/pull/42#issuecomment-1',
+    'https://github.com/PortSwigger/Example-Ext/pull/42?diff=split',
+    'github.com/PortSwigger/Example-Ext/pull/42',
+]
+
+INVALID_LINKS = [
+    '',
+    'not-a-github-url',
+    'https://github.com/PortSwigger',
+    'https://github.com/PortSwigger/',
+    'https://gitlab.com/PortSwigger/Example-Ext',
+    'https://github.com.evil.com/PortSwigger/Example-Ext',
+    'https://evil.com/github.com/PortSwigger/Example-Ext',
+    'https://github.com/Port Swigger/Example-Ext',
+    # Only the scp-style ssh form separates the path with ":", so a port
+    # is never taken for the owner.
+    'https://github.com:443/PortSwigger/Example-Ext',
+    'github.com:PortSwigger/Example-Ext',
+]
+
+
+class ParseTests(unittest.TestCase):
+    def test_repository_links(self):
+        for link in REPO_LINKS:
+            with self.subTest(link=link):
+                ref = gr.parse(link)
+                self.assertIsInstance(ref, gr.RepoRef)
+                self.assertEqual((ref.owner, ref.repo), ('PortSwigger', 'Example-Ext'))
+                self.assertEqual(ref.key, 'portswigger/example-ext')
+
+    def test_pull_request_links(self):
+        for link in PULL_LINKS:
+            with self.subTest(link=link):
+                ref = gr.parse(link)
+                self.assertIsInstance(ref, gr.PullRef)
+                self.assertEqual(ref.number, 42)
+                self.assertEqual(ref.key, 'portswigger/example-ext#42')
+                self.assertEqual(ref.repository, gr.RepoRef('PortSwigger', 'Example-Ext'))
+
+    def test_invalid_links(self):
+        for link in INVALID_LINKS + [None]:
+            with self.subTest(link=link):
+                self.assertIsNone(gr.parse(link))
+
+    def test_branch(self):
+        self.assertEqual(gr.parse('https://github.com/o/r/tree/feature/x?a=1').branch, 'feature/x')
+        self.assertIsNone(gr.parse('https://github.com/o/r').branch)
+
+    def test_names_with_dots_and_underscores(self):
+        ref = gr.parse('https://github.com/owner/my.repo_name.git')
+        self.assertEqual(ref.repo, 'my.repo_name')
+        self.assertEqual(gr.parse('https://github.com/o/site.github.io').repo, 'site.github.io')
+
+    def test_canonical_urls(self):
+        self.assertEqual(gr.parse('git@github.com:O/R.git').url, 'https://github.com/O/R')
+        self.assertEqual(gr.parse('github.com/O/R/pull/7/files').url, 'https://github.com/O/R/pull/7')
+
+
+class RefTests(unittest.TestCase):
+    def test_immutable(self):
+        ref = gr.parse('https://github.com/o/r/pull/1')
+        with self.assertRaises(AttributeError):
+            ref.number = 2
+        with self.assertRaises(AttributeError):
+            del ref.owner
+        with self.assertRaises(AttributeError):
+            ref.extra = 1
+
+    def test_equality_is_case_insensitive(self):
+        self.assertEqual(gr.RepoRef('Owner', 'Repo'), gr.RepoRef('owner', 'repo'))
+        self.assertEqual(len({gr.RepoRef('Owner', 'Repo'), gr.RepoRef('owner', 'repo')}), 1)
+        self.assertNotEqual(gr.RepoRef('o', 'r'), gr.RepoRef('o', 'r', 'main'))
+        self.assertNotEqual(gr.RepoRef('o', 'r'), gr.PullRef('o', 'r', 1))
+
+    def test_memoized(self):
+        link = 'https://github.com/memo/ized'
+        self.assertIs(gr.parse(link), gr.parse(link))
+
+
+class CrossScriptConsistencyTests(unittest.TestCase):
+    """Every script must read a link the same way github_ref does."""
+
+    OWNER_REPO_PARSERS = {
+        'validate_repo': validate_repo.extract_owner_repo,
+        'detect_language': detect_language.extract_owner_repo,
+        'idempotency': idempotency.extract_owner_repo,
+        'fingerprint': fingerprint.extract_owner_repo,
+    }
+
+    def test_owner_repo(self):
+        for link in REPO_LINKS + PULL_LINKS:
+            expected = gr.parse_repo(link)
+            for script, parser in self.OWNER_REPO_PARSERS.items():
+                with self.subTest(script=script, link=link):
+                    self.assertEqual(parser(link), (expected.owner, expected.repo))
+
+    def test_owner_repo_rejections(self):
+        for link in INVALID_LINKS:
+            for script, parser in self.OWNER_REPO_PARSERS.items():
+                with self.subTest(script=script, link=link):
+                    with self.assertRaises(ValueError) as ctx:
+                        parser(link)
+                    self.assertIn('Could not extract owner/repo from URL', str(ctx.exception))
+
+    def test_repo_keys_agree(self):
+        for link in REPO_LINKS + PULL_LINKS:
+            with self.subTest(link=link):
+                self.assertEqual(repo_identity.repo_name_key(link), 'portswigger/example-ext')
+                self.assertEqual(resolve_source_repo.normalize_url(link).split('/pull/')[0],
+                                 'https://github.com/portswigger/example-ext')
+
+    def test_pull_refs(self):
+        for link in PULL_LINKS:
+            with self.subTest(link=link):
+                self.assertEqual(resolve_source_repo.extract_pr_ref(link), ('PortSwigger', 'Example-Ext', '42'))
+        for link in REPO_LINKS + INVALID_LINKS:
+            with self.subTest(link=link):
+                with self.assertRaises(ValueError):
+                    resolve_source_repo.extract_pr_ref(link)
+
+    def test_idempotency_keys_agree_across_forms(self):
+        keys = {idempotency.idempotency_key(1, '/update', link, 'abc') for link in REPO_LINKS}
+        self.assertEqual(len(keys), 1)
+
+    def test_normalize_non_github_urls(self):
+        self.assertEqual(gr.normalize_url('https://gitlab.com/Owner/Repo.git/'), 'https://gitlab.com/owner/repo')
+        self.assertEqual(gr.normalize_url(None), '')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
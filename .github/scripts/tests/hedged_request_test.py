@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+
+"""
+Tests for hedged_request.py
+Run with: python hedged_request_test.py
+
+Requests are served by a local HTTP server whose responses can be delayed
+per request, so the tests need no network.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from urllib.error import HTTPError
+
+# Make the module under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import hedged_request as hr
+from fakes import LocalServer, QuietHandler
+
+
+class DelayedServer(LocalServer):
+    """
+    Serve GETs on a local HTTP server.
+
+    `delays` lists how long the first, second, ... requests wait before
+    responding; later requests respond immediately. `statuses` likewise
+    lists their statuses; later requests get `status`.
+    """
+
+    def __init__(self, delays=(), status=200, statuses=()):
+        self.delays = list(delays)
+        self.statuses = list(statuses)
+        self.hits = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(QuietHandler):
+            def do_GET(self):
+                with server.lock:
+                    number = server.hits
+                    server.hits += 1
+                    delay = server.delays[number] if number < len(server.delays) else 0
+                    code = server.statuses[number] if number < len(server.statuses) else status
+                time.sleep(delay)
+                body = f'response {number}'.encode()
+                try:
+                    self.send_response(code)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass
+
+        super().__init__(Handler, threaded=True)
+        self.url += '/repos/owner/repo'
+
+
+def fast_policy(**overrides):
+    args = {'initial_delay': 0.1, 'min_delay': 0.01, 'min_samples': 3}
+    args.update(overrides)
+    return hr.HedgePolicy(**args)
+
+
+class HedgePolicyTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def test_initial_delay_until_enough_samples(self):
+        policy = hr.HedgePolicy(initial_delay=2.0, min_samples=3)
+        policy.record(0.1)
+        self.assertEqual(policy.delay(), 2.0)
+
+    def test_delay_from_percentile_within_bounds(self):
+        policy = hr.HedgePolicy(percentile=0.9, min_delay=0.05, max_delay=1.0, min_samples=10)
+        for i in range(1, 11):
+            policy.record(i / 100)
+        self.assertEqual(policy.delay(), 0.1)
+
+        for _ in range(100):
+            policy.record(30.0)
+        self.assertEqual(policy.delay(), 1.0)
+
+    def test_hedge_budget(self):
+        policy = hr.HedgePolicy(max_hedge_ratio=0.1, hedge_burst=1)
+        policy.metrics['requests'] = 10
+        self.assertTrue(policy.try_hedge())
+        self.assertTrue(policy.try_hedge())
+        self.assertFalse(policy.try_hedge())
+        self.assertEqual(policy.metrics['hedges_capped'], 1)
+
+    def test_latencies_saved_and_loaded(self):
+        path = os.path.join(self.tmp, 'cache', 'latencies.json')
+        policy = hr.HedgePolicy()
+        policy.record(0.5)
+        policy.record(0.25)
+        policy.save(path)
+
+        loaded = hr.HedgePolicy(window=1)
+        loaded.load(path)
+        self.assertEqual(list(loaded.latencies), [0.25])
+
+    def test_missing_or_unreadable_latency_file_is_ignored(self):
+        path = os.path.join(self.tmp, 'latencies.json')
+        policy = hr.HedgePolicy()
+        policy.load(path)
+        with open(path, 'w') as f:
+            f.write('{not json')
+        with mock.patch('sys.stderr', new=StringIO()) as stderr:
+            policy.load(path)
+        self.assertIn('Ignoring unreadable latency file', stderr.getvalue())
+        self.assertEqual(len(policy.latencies), 0)
+
+
+class FetchTests(unittest.TestCase):
+    def test_fast_response_is_not_hedged(self):
+        policy = fast_policy()
+        with DelayedServer() as server:
+            self.assertEqual(hr.fetch(server.url, policy=policy), b'response 0')
+        self.assertEqual(server.hits, 1)
+        self.assertEqual(policy.metrics['hedged'], 0)
+        self.assertEqual(len(policy.latencies), 1)
+
+    def test_stalled_response_is_hedged_and_hedge_wins(self):
+        policy = fast_policy()
+        with DelayedServer(delays=[2.0]) as server:
+            begin = time.monotonic()
+            body = hr.fetch(server.url, policy=policy)
+            elapsed = time.monotonic() - begin
+        self.assertEqual(body, b'response 1')
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(policy.metrics['hedged'], 1)
+        self.assertEqual(policy.metrics['hedge_wins'], 1)
+        self.assertIn('1 won by the hedge', policy.summary())
+
+    def test_losing_attempt_latency_is_recorded(self):
+        policy = fast_policy()
+        with DelayedServer(delays=[0.5]) as server:
+            self.assertEqual(hr.fetch(server.url, policy=policy), b'response 1')
+            waited = 0
+            while len(policy.latencies) < 2 and waited < 2:
+                time.sleep(0.05)
+                waited += 0.05
+        self.assertEqual(len(policy.latencies), 2)
+        self.assertGreaterEqual(max(policy.latencies), 0.5)
+
+    def test_original_can_still_win(self):
+        policy = fast_policy()
+        with DelayedServer(delays=[0.3, 2.0]) as server:
+            body = hr.fetch(server.url, policy=policy)
+        self.assertEqual(body, b'response 0')
+        self.assertEqual(policy.metrics['hedged'], 1)
+        self.assertEqual(policy.metrics['hedge_wins'], 0)
+
+    def test_transient_error_on_hedge_does_not_fail_the_call(self):
+        policy = fast_policy()
+        with DelayedServer(delays=[0.5], statuses=[200, 502]) as server:
+            self.assertEqual(hr.fetch(server.url, policy=policy), b'response 0')
+        self.assertEqual(server.hits, 2)
+
+    def test_client_error_on_hedge_is_raised_at_once(self):
+        policy = fast_policy()
+        # Had it waited, the original would have returned 200.
+        with DelayedServer(delays=[1.0], statuses=[200, 404]) as server:
+            with self.assertRaises(HTTPError) as ctx:
+                hr.fetch(server.url, policy=policy)
+        self.assertEqual(ctx.exception.code, 404)
+
+    def test_transient_errors_on_every_attempt_are_raised(self):
+        with DelayedServer(delays=[0.3], status=503) as server:
+            with self.assertRaises(HTTPError) as ctx:
+                hr.fetch(server.url, policy=fast_policy())
+        self.assertEqual(ctx.exception.code, 503)
+
+    def test_no_hedge_when_budget_exhausted(self):
+        policy = fast_policy(hedge_burst=0, max_hedge_ratio=0)
+        with DelayedServer(delays=[0.3]) as server:
+            self.assertEqual(hr.fetch(server.url, policy=policy), b'response 0')
+        self.assertEqual(server.hits, 1)
+        self.assertEqual(policy.metrics['hedges_capped'], 1)
+
+    def test_deadline(self):
+        policy = fast_policy()
+        with DelayedServer(delays=[2.0, 2.0]) as server:
+            with self.assertRaises(ValueError) as ctx:
+                hr.fetch(server.url, deadline=0.4, policy=policy)
+        self.assertIn('timed out after 0.4s', str(ctx.exception))
+        self.assertEqual(policy.metrics['deadlines'], 1)
+
+    def test_http_error_is_raised(self):
+        with DelayedServer(status=404) as server:
+            with self.assertRaises(HTTPError) as ctx:
+                hr.fetch(server.url, policy=fast_policy())
+        self.assertEqual(ctx.exception.code, 404)
+
+    def test_connection_error_is_raised(self):
+        with DelayedServer() as server:
+            url = server.url
+        with self.assertRaises(OSError):
+            hr.fetch(url, policy=fast_policy(hedge_burst=0))
+
+
+class ReportingTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'latencies.json')
+        policy = mock.patch.object(hr, 'DEFAULT_POLICY', fast_policy())
+        self.policy = policy.start()
+        self.addCleanup(policy.stop)
+
+    def run_wrapped(self, main):
+        with mock.patch.dict('os.environ', {'HEDGE_LATENCY_FILE': self.path}, clear=True), \
+                mock.patch('sys.stdout', new=StringIO()) as stdout:
+            hr.reporting(main)()
+        return stdout.getvalue()
+
+    def test_latencies_persist_and_summary_is_written(self):
+        with open(self.path, 'w') as f:
+            json.dump([0.2], f)
+
+        with DelayedServer() as server:
+            summary = self.run_wrapped(lambda: hr.fetch(server.url, policy=self.policy))
+        self.assertIn('Hedged GitHub API requests: 1 requests, 0 hedged', summary)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_nothing_written_without_requests(self):
+        summary = self.run_wrapped(lambda: None)
+        self.assertEqual(summary, '')
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
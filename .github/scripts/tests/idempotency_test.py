@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""
+Tests for idempotency.py
+Run with: python idempotency_test.py
+
+The GitHub API is mocked so the tests are deterministic and need no network.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import idempotency
+
+
+SHA = 'a' * 40
+
+
+class IdempotencyKeyTests(unittest.TestCase):
+    def key(self, **overrides):
+        args = {'issue_number': 12, 'command': '/resubmit', 'repo_url': 'https://github.com/owner/repo', 'head_sha': SHA}
+        args.update(overrides)
+        return idempotency.idempotency_key(**args)
+
+    def test_key_is_compact_hex(self):
+        self.assertRegex(self.key(), r'^[0-9a-f]{16}$')
+
+    def test_equivalent_urls_and_commands_share_a_key(self):
+        self.assertEqual(self.key(), self.key(repo_url='https://github.com/Owner/Repo.git/'))
+        self.assertEqual(self.key(), self.key(command='/resubmit please run it again'))
+        self.assertEqual(self.key(), self.key(issue_number='12'))
+
+    def test_any_change_gives_a_new_key(self):
+        self.assertNotEqual(self.key(), self.key(issue_number=13))
+        self.assertNotEqual(self.key(), self.key(command='/reopen'))
+        self.assertNotEqual(self.key(), self.key(repo_url='https://github.com/owner/other'))
+        self.assertNotEqual(self.key(), self.key(head_sha='b' * 40))
+
+
+class FileStateStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'state', 'runs.json')
+
+    def test_recorded_key_is_seen_by_a_new_store(self):
+        idempotency.FileStateStore(self.path).record('0123456789abcdef')
+        store = idempotency.FileStateStore(self.path)
+        self.assertTrue(store.contains('0123456789abcdef'))
+        self.assertFalse(store.contains('fedcba9876543210'))
+
+    def test_missing_file_is_empty(self):
+        self.assertFalse(idempotency.FileStateStore(self.path).contains('0123456789abcdef'))
+
+    def test_corrupt_file_is_treated_as_empty(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        with mock.patch('sys.stderr', new=StringIO()):
+            self.assertFalse(idempotency.FileStateStore(self.path).contains('0123456789abcdef'))
+
+    def test_oldest_entries_are_dropped(self):
+        store = idempotency.FileStateStore(self.path)
+        with mock.patch.object(idempotency, 'MAX_STATE_ENTRIES', 2):
+            for timestamp, key in enumerate(['a', 'b', 'c']):
+                with mock.patch('idempotency.time.time', return_value=timestamp):
+                    store.record(key)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {'b': 1, 'c': 2})
+
+
+class CommentMarkerStoreTests(unittest.TestCase):
+    def test_markers_found_across_pages(self):
+        first_page = [{'body': 'hello'}] * 99 + [{'body': 'done ' + idempotency.comment_marker('0123456789abcdef')}]
+        second_page = [{'body': None}]
+        with mock.patch.object(idempotency, 'github_api_get', side_effect=[first_page, second_page]) as get:
+            store = idempotency.CommentMarkerStore('PortSwigger/extension-portal', 7)
+            self.assertTrue(store.contains('0123456789abcdef'))
+            self.assertFalse(store.contains('fedcba9876543210'))
+        self.assertEqual(get.call_count, 2)
+        self.assertIn('/issues/7/comments?per_page=100&page=2', get.call_args.args[0])
+
+    def test_record_returns_marker(self):
+        with mock.patch.object(idempotency, 'github_api_get', return_value=[]) as get:
+            store = idempotency.CommentMarkerStore('PortSwigger/extension-portal', 7)
+            marker = store.record('0123456789abcdef')
+            get.assert_not_called()
+            self.assertTrue(store.contains('0123456789abcdef'))
+        self.assertEqual(idempotency.find_markers([marker]), {'0123456789abcdef'})
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.env = {
+            'ISSUE_NUMBER': '12',
+            'COMMAND': '/resubmit',
+            'URL': 'https://github.com/owner/repo',
+            'STATE_FILE': os.path.join(self.tmp.name, 'runs.json'),
+        }
+
+    def run_main(self, **env):
+        outputs = {}
+        with mock.patch.dict('os.environ', {**self.env, **env}, clear=True), \
+                mock.patch.object(idempotency, 'set_output', side_effect=outputs.__setitem__), \
+                mock.patch.object(idempotency, 'fetch_head_sha', return_value=SHA) as fetch:
+            idempotency.main()
+        return outputs, fetch
+
+    def test_check_record_check(self):
+        outputs, fetch = self.run_main(MODE='check')
+        self.assertEqual(outputs['already_processed'], 'false')
+        fetch.assert_called_once_with('owner', 'repo', None)
+
+        self.run_main(MODE='record')
+
+        with mock.patch('sys.stdout', new=StringIO()):
+            outputs, _ = self.run_main(MODE='check')
+        self.assertEqual(outputs['already_processed'], 'true')
+
+    def test_head_sha_from_environment_skips_api(self):
+        outputs, fetch = self.run_main(MODE='check', HEAD_SHA=SHA)
+        fetch.assert_not_called()
+        self.assertEqual(outputs['key'], idempotency.idempotency_key('12', '/resubmit', self.env['URL'], SHA))
+
+    @mock.patch('idempotency.set_output')
+    @mock.patch.dict('os.environ', {'URL': 'https://github.com/owner/repo'}, clear=True)
+    def test_missing_issue_number(self, mock_set_output):
+        with self.assertRaises(SystemExit) as cm:
+            with mock.patch('sys.stderr', new=StringIO()):
+                idempotency.main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(mock_set_output.call_args.args[0], 'error_message')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""
+Tests for repo_identity.py
+Run with: python repo_identity_test.py
+
+The GitHub API is mocked so the tests are deterministic and need no network.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import repo_identity as ri
+from fakes import FakeClock
+
+
+REPOS = {
+    # Renamed: the old name redirects to the new one.
+    'https://api.github.com/repos/author/old-widget': {
+        'id': 42, 'full_name': 'new-owner/Widget', 'html_url': 'https://github.com/new-owner/Widget'},
+    'https://api.github.com/repos/new-owner/widget': {
+        'id': 42, 'full_name': 'new-owner/Widget', 'html_url': 'https://github.com/new-owner/Widget'},
+    'https://api.github.com/repos/other/gadget': {
+        'id': 7, 'full_name': 'other/gadget', 'html_url': 'https://github.com/other/gadget'},
+}
+
+
+def fake_api(api_url, github_token=None):
+    if api_url not in REPOS:
+        raise ValueError(f"GitHub resource not found: {api_url}")
+    return REPOS[api_url]
+
+
+class RepoNameKeyTests(unittest.TestCase):
+    def test_strips_git_suffix_and_lowercases(self):
+        self.assertEqual(ri.repo_name_key('https://github.com/Author/Widget.git'), 'author/widget')
+
+    def test_ignores_trailing_path(self):
+        self.assertEqual(ri.repo_name_key('github.com/author/widget/tree/main'), 'author/widget')
+
+    def test_rejects_non_github_url(self):
+        with self.assertRaises(ValueError):
+            ri.repo_name_key('https://gitlab.com/author/widget')
+
+
+class ResolveIdentityTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'cache', 'identity.json')
+        self.clock = FakeClock(now=1000)
+        patcher = mock.patch.object(ri, 'github_api_get', side_effect=fake_api)
+        self.api = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cache(self):
+        return ri.IdentityCache(self.path, ttl=100, clock=self.clock)
+
+    def test_renamed_repository_resolves_to_canonical_url(self):
+        identity = ri.resolve_identity('https://github.com/author/old-widget', self.cache())
+        self.assertEqual(identity, ri.RepoIdentity(42, 'new-owner/Widget', 'https://github.com/new-owner/Widget'))
+
+    def test_old_and_new_names_share_one_cached_lookup(self):
+        cache = self.cache()
+        ri.resolve_identity('https://github.com/author/old-widget', cache)
+        identity = ri.resolve_identity('https://github.com/New-Owner/Widget', cache)
+        self.assertEqual(identity.id, 42)
+        self.assertEqual(self.api.call_count, 1)
+
+    def test_cache_persists_between_runs(self):
+        cache = self.cache()
+        ri.resolve_identity('https://github.com/author/old-widget', cache)
+        cache.save()
+
+        identity = ri.resolve_identity('https://github.com/author/old-widget', self.cache())
+        self.assertEqual(identity.html_url, 'https://github.com/new-owner/Widget')
+        self.assertEqual(self.api.call_count, 1)
+
+    def test_expired_entries_are_refetched(self):
+        cache = self.cache()
+        ri.resolve_identity('https://github.com/other/gadget', cache)
+        self.clock.now += 100
+        ri.resolve_identity('https://github.com/other/gadget', cache)
+        self.assertEqual(self.api.call_count, 2)
+
+    def test_corrupt_cache_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('not json')
+        with mock.patch('sys.stderr', new=StringIO()):
+            identity = ri.resolve_identity('https://github.com/other/gadget', self.cache())
+        self.assertEqual(identity.id, 7)
+
+    def test_same_repository(self):
+        cache = self.cache()
+        self.assertTrue(ri.same_repository(
+            'https://github.com/author/old-widget', 'https://github.com/new-owner/widget.git', cache))
+        self.assertFalse(ri.same_repository(
+            'https://github.com/author/old-widget', 'https://github.com/other/gadget', cache))
+
+    def test_same_url_needs_no_lookup(self):
+        self.assertTrue(ri.same_repository(
+            'https://github.com/Other/Gadget/', 'https://github.com/other/gadget', self.cache()))
+        self.api.assert_not_called()
+
+
+class MainTests(unittest.TestCase):
+    def test_outputs_id_and_canonical_url(self):
+        outputs = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, 'identity.json')
+            env = {'URL': 'https://github.com/author/old-widget', 'IDENTITY_CACHE': cache_path}
+            with mock.patch.dict('os.environ', env, clear=True), \
+                    mock.patch.object(ri, 'github_api_get', side_effect=fake_api), \
+                    mock.patch.object(ri, 'set_output', side_effect=outputs.__setitem__):
+                ri.main()
+            self.assertTrue(os.path.exists(cache_path))
+        self.assertEqual(outputs, {'repo_id': 42, 'canonical_url': 'https://github.com/new-owner/Widget'})
+
+    @mock.patch('repo_identity.set_output')
+    @mock.patch.dict('os.environ', {}, clear=True)
+    def test_missing_url(self, mock_set_output):
+        with self.assertRaises(SystemExit) as cm:
+            with mock.patch('sys.stderr', new=StringIO()):
+                ri.main()
+        self.assertEqual(cm.exception.code, 1)
+        mock_set_output.assert_called_once_with('error_message', 'URL environment variable is required')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
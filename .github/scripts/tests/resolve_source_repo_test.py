@@ -118,6 +118,24 @@ class ResolveSourceRepoTests(unittest.TestCase):
                 'https://github.com/author/widget',
             )
 
+    def test_matching_uses_repository_ids_across_renames(self):
+        pull = {'head': {'repo': {'id': 42, 'html_url': 'https://github.com/author/old-widget'}}}
+        base = {'fork': True, 'parent': {'id': 42, 'html_url': 'https://github.com/new-owner/widget'},
+                'html_url': 'https://github.com/PortSwigger/widget'}
+        with mock.patch.object(rsr, 'github_api_get', fake_api(pull, base)):
+            self.assertEqual(
+                rsr.resolve_source_repo('PortSwigger', 'widget', '1'),
+                'https://github.com/new-owner/widget',
+            )
+
+    def test_different_repository_ids_are_rejected(self):
+        pull = {'head': {'repo': {'id': 7, 'html_url': 'https://github.com/author/widget'}}}
+        base = {'fork': True, 'parent': {'id': 42, 'html_url': 'https://github.com/author/widget'},
+                'html_url': 'https://github.com/PortSwigger/widget'}
+        with mock.patch.object(rsr, 'github_api_get', fake_api(pull, base)):
+            with self.assertRaises(ValueError):
+                rsr.resolve_source_repo('PortSwigger', 'widget', '1')
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+"""
+Tests for run_analytics.py
+Run with: python run_analytics_test.py
+
+The Actions API is replayed from fixtures/actions_runs.json, recorded runs of
+process-created-issue.yml, so the tests need no network.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import run_analytics as ra
+
+
+FIXTURE = json.loads((Path(__file__).parent / 'fixtures' / 'actions_runs.json').read_text())
+WORKFLOW = FIXTURE['workflow']
+REPOSITORY = 'PortSwigger/extension-portal'
+NOW = datetime(2024, 5, 5, tzinfo=timezone.utc)
+
+
+class FakeActionsApi:
+    """Serve the recorded runs (optionally only some of them) and their jobs."""
+
+    def __init__(self, run_ids=None, per_page=ra.PER_PAGE):
+        self.runs = [run for run in FIXTURE['workflow_runs'] if run_ids is None or run['id'] in run_ids]
+        self.per_page = per_page
+        self.urls = []
+
+    def __call__(self, url):
+        self.urls.append(url)
+        path, _, query = url.partition('?')
+        if not query:
+            run_id = int(path.split('/')[-1])
+            for run in self.runs:
+                if run['id'] == run_id:
+                    return run
+            raise ra.GitHubNotFound(f"GitHub resource not found: {url}")
+        page = int(dict(param.split('=') for param in query.split('&'))['page'])
+        if path.endswith(f'/actions/workflows/{WORKFLOW}/runs'):
+            start = (page - 1) * self.per_page
+            return {'total_count': len(self.runs), 'workflow_runs': self.runs[start:start + self.per_page]}
+        run_id = path.split('/')[-2]
+        return FIXTURE['jobs'][run_id] if page == 1 else {'jobs': []}
+
+    def jobs_fetched(self):
+        return sorted({int(url.split('/')[-2]) for url in self.urls if '/jobs?' in url})
+
+
+class SyncTests(unittest.TestCase):
+    def setUp(self):
+        self.db = ra.connect(':memory:')
+
+    def test_stores_runs_jobs_and_steps(self):
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=FakeActionsApi()), 4)
+
+        counts = [self.db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in ('runs', 'jobs', 'steps')]
+        self.assertEqual(counts, [4, 12, 20])
+        self.assertEqual(self.db.execute('SELECT duration FROM runs WHERE id = 1001').fetchone()[0], 480.0)
+        self.assertEqual(self.db.execute('SELECT duration FROM jobs WHERE id = 10011').fetchone()[0], 25.0)
+
+    def test_incremental_sync_fetches_only_new_runs(self):
+        ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=FakeActionsApi(run_ids={1001, 1002, 1003}))
+
+        api = FakeActionsApi()
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=api), 1)
+        self.assertEqual(api.jobs_fetched(), [1004])
+        self.assertEqual(len([url for url in api.urls if '/runs?' in url]), 1)
+
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=FakeActionsApi()), 0)
+
+    def test_pages_through_runs(self):
+        with mock.patch.object(ra, 'PER_PAGE', 2):
+            api = FakeActionsApi(per_page=2)
+            self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=api), 4)
+        self.assertEqual(api.jobs_fetched(), [1001, 1002, 1003, 1004])
+
+    def test_run_in_progress_does_not_hold_back_newer_runs(self):
+        api = FakeActionsApi()
+        api.runs = [dict(run, status='queued') if run['id'] == 1003 else run for run in api.runs]
+
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=api), 3)
+        self.assertEqual(api.jobs_fetched(), [1001, 1002, 1004])
+        self.assertEqual(self.db.execute('SELECT id FROM pending_runs').fetchall(), [(1003,)])
+
+        # Still queued: checked again, but not stored.
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=api), 0)
+
+        # Once it completes, it is picked up on its own.
+        api = FakeActionsApi()
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=api), 1)
+        self.assertEqual(api.jobs_fetched(), [1003])
+        self.assertEqual(self.db.execute('SELECT COUNT(*) FROM pending_runs').fetchone()[0], 0)
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=FakeActionsApi()), 0)
+
+    def test_deleted_pending_run_is_dropped(self):
+        api = FakeActionsApi(run_ids={1001, 1002, 1003})
+        api.runs = [dict(run, status='queued') if run['id'] == 1003 else run for run in api.runs]
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=api), 2)
+
+        # 1003 is deleted while queued, and 1004 completes.
+        api = FakeActionsApi(run_ids={1001, 1002, 1004})
+        with mock.patch('sys.stderr', new=StringIO()) as stderr:
+            self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=api), 1)
+        self.assertIn('Pending run 1003', stderr.getvalue())
+        self.assertEqual(self.db.execute('SELECT COUNT(*) FROM pending_runs').fetchone()[0], 0)
+        self.assertEqual([row[0] for row in self.db.execute('SELECT id FROM runs ORDER BY id')], [1001, 1002, 1004])
+
+        self.assertEqual(ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=api), 0)
+
+    def test_api_error_keeps_runs_already_stored(self):
+        api = FakeActionsApi()
+
+        def failing_get(url):
+            if '/runs/1003/jobs' in url:
+                raise ValueError('GitHub API error: 502 Bad Gateway')
+            return api(url)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'runs.sqlite')
+            with self.assertRaises(ValueError):
+                ra.sync_workflow(ra.connect(path), REPOSITORY, WORKFLOW, get=failing_get)
+            stored = [row[0] for row in sqlite3.connect(path).execute('SELECT id FROM runs ORDER BY id')]
+        self.assertEqual(stored, [1001, 1002])
+
+
+class LatencyTests(unittest.TestCase):
+    def setUp(self):
+        self.db = ra.connect(':memory:')
+        ra.sync_workflow(self.db, REPOSITORY, WORKFLOW, get=FakeActionsApi())
+
+    def rows_by_key(self, **kwargs):
+        return {(job, step): rest for _, job, step, *rest in ra.latency_rows(self.db, now=NOW, **kwargs)}
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual([ra.percentile(values, pct) for pct in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(ra.percentile([7.0], 99), 7.0)
+
+    def test_job_and_step_percentiles(self):
+        rows = self.rows_by_key()
+        self.assertEqual(rows[('extract-issue-details', '')], [4, 30.0, 40.0, 40.0])
+        verify = rows[('validate-submission', 'Verify repository exists and is not a fork')]
+        self.assertEqual(verify[0], 4)
+        self.assertEqual(verify[3], 298.0)
+
+    def test_skipped_jobs_and_steps_excluded(self):
+        rows = self.rows_by_key()
+        self.assertNotIn(('submit-update', ''), rows)
+        self.assertNotIn(('validate-submission', 'Resolve source repository'), rows)
+
+    def test_rolling_window(self):
+        rows = self.rows_by_key(window_days=3)
+        self.assertEqual(rows[('extract-issue-details', '')], [3, 35.0, 40.0, 40.0])
+        self.assertEqual(ra.latency_rows(self.db, window_days=30, now=datetime(2024, 7, 1, tzinfo=timezone.utc)), [])
+
+
+class FormatTests(unittest.TestCase):
+    rows = [('wf.yml', 'build', '', 3, 10.0, 20.0, 30.0), ('wf.yml', 'build', 'Compile', 3, 5.0, 6.25, 7.0)]
+
+    def test_markdown(self):
+        lines = ra.format_markdown(self.rows).splitlines()
+        self.assertEqual(lines[0], '| Workflow | Job | Step | Runs | p50 (s) | p95 (s) | p99 (s) |')
+        self.assertEqual(lines[2], '| wf.yml | build | (job) | 3 | 10.0 | 20.0 | 30.0 |')
+        self.assertEqual(lines[3], '| wf.yml | build | Compile | 3 | 5.0 | 6.2 | 7.0 |')
+
+    def test_csv(self):
+        self.assertEqual(ra.format_csv(self.rows), (
+            'workflow,job,step,runs,p50,p95,p99\n'
+            'wf.yml,build,,3,10.0,20.0,30.0\n'
+            'wf.yml,build,Compile,3,5.0,6.25,7.0\n'
+        ))
+
+
+class MainTests(unittest.TestCase):
+    def test_writes_csv_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                'GITHUB_REPOSITORY': REPOSITORY,
+                'WORKFLOWS': WORKFLOW,
+                'DB_PATH': os.path.join(tmp, 'runs.sqlite'),
+                'WINDOW_DAYS': '36500',
+                'FORMAT': 'csv',
+                'REPORT_PATH': os.path.join(tmp, 'report.csv'),
+            }
+            with mock.patch.dict('os.environ', env, clear=True), \
+                    mock.patch('run_analytics.github_api_get', side_effect=lambda url, token: FakeActionsApi()(url)), \
+                    mock.patch('sys.stdout', new=StringIO()) as stdout:
+                ra.main()
+            report = Path(env['REPORT_PATH']).read_text()
+
+        self.assertIn(f'Synced 4 new run(s) of {WORKFLOW}', stdout.getvalue())
+        self.assertTrue(report.startswith('workflow,job,step,runs,p50,p95,p99\n'))
+        self.assertIn(f'{WORKFLOW},extract-issue-details,,4,30.0,40.0,40.0\n', report)
+
+    @mock.patch('run_analytics.set_output')
+    @mock.patch.dict('os.environ', {'GITHUB_REPOSITORY': REPOSITORY, 'FORMAT': 'html'}, clear=True)
+    def test_invalid_format(self, mock_set_output):
+        with self.assertRaises(SystemExit) as cm:
+            with mock.patch('sys.stderr', new=StringIO()):
+                ra.main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(mock_set_output.call_args.args[0], 'error_message')
+
+    @mock.patch('run_analytics.set_output')
+    @mock.patch('run_analytics.github_api_get', side_effect=ValueError('GitHub API error: 403 Forbidden'))
+    def test_api_error(self, _, mock_set_output):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {'GITHUB_REPOSITORY': REPOSITORY, 'DB_PATH': os.path.join(tmp, 'runs.sqlite')}
+            with mock.patch.dict('os.environ', env, clear=True):
+                with self.assertRaises(SystemExit):
+                    with mock.patch('sys.stderr', new=StringIO()):
+                        ra.main()
+        mock_set_output.assert_called_once_with('error_message', 'GitHub API error: 403 Forbidden')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
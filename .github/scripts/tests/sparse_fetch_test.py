@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+"""
+Tests for sparse_fetch.py
+Run with: python sparse_fetch_test.py
+
+Clones are made from local bare repositories over file://, so the tests need
+git but no network.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import sparse_fetch as sf
+
+
+def git(*args, cwd=None):
+    return subprocess.run(
+        ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+        cwd=cwd, check=True, capture_output=True,
+    ).stdout.decode()
+
+
+def make_bare_repo(root, files):
+    """Commit files to a new bare repository that serves partial clones; return its file:// URL."""
+    work = os.path.join(root, 'work')
+    bare = os.path.join(root, 'origin.git')
+    git('init', '-q', '-b', 'main', work)
+    for path, content in files.items():
+        full_path = os.path.join(work, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(content)
+    git('add', '-A', cwd=work)
+    git('commit', '-q', '-m', 'initial', cwd=work)
+    git('clone', '-q', '--bare', work, bare)
+    git('config', 'uploadpack.allowFilter', 'true', cwd=bare)
+    git('config', 'uploadpack.allowAnySHA1InWant', 'true', cwd=bare)
+    return Path(bare).as_uri()
+
+
+def missing_blobs(dest):
+    """Return the number of blobs at HEAD that have not been downloaded."""
+    output = git('rev-list', '--objects', '--missing=print', 'HEAD', cwd=dest)
+    return sum(1 for line in output.splitlines() if line.startswith('?'))
+
+
+MULTI_MODULE = {
+    'pom.xml': '<project><modules><module>core</module></modules></project>',
+    'core/pom.xml': '<project/>',
+    'core/src/main/java/Core.java': 'class Core {}',
+    'ui/src/main/java/Ui.java': 'class Ui {}',
+    'docs/guide.md': '# Guide',
+}
+
+
+class SparseConeTests(unittest.TestCase):
+    def test_root_files_need_no_cone_entry(self):
+        self.assertEqual(sf.sparse_cone(['pom.xml', 'gradlew']), [])
+
+    def test_module_directories_are_deduplicated(self):
+        self.assertEqual(
+            sf.sparse_cone(['pom.xml', 'core/pom.xml', 'plugins/a/build.gradle', 'plugins/a/settings.gradle']),
+            ['core', 'plugins/a'],
+        )
+
+
+class SparseFetcherTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.url = make_bare_repo(self.tmp.name, MULTI_MODULE)
+        self.dest = os.path.join(self.tmp.name, 'clone')
+
+    def test_fetch_lists_paths_without_downloading_blobs(self):
+        fetcher = sf.SparseFetcher(self.url, self.dest).fetch()
+
+        self.assertEqual(fetcher.build_files, ['core/pom.xml', 'pom.xml'])
+        self.assertTrue(fetcher.exists('ui/src/main/java/Ui.java'))
+        self.assertEqual(missing_blobs(self.dest), len(MULTI_MODULE))
+        self.assertEqual(sf.detect_build_system(fetcher), 'Maven')
+
+    def test_read_fetches_only_the_requested_blob(self):
+        fetcher = sf.SparseFetcher(self.url, self.dest).fetch()
+
+        self.assertIn(b'<module>core</module>', fetcher.read('pom.xml'))
+        self.assertEqual(missing_blobs(self.dest), len(MULTI_MODULE) - 1)
+
+    def test_read_missing_file_raises(self):
+        fetcher = sf.SparseFetcher(self.url, self.dest).fetch()
+        with self.assertRaises(ValueError):
+            fetcher.read('build.gradle')
+
+    def test_checkout_materialises_only_the_cone(self):
+        fetcher = sf.SparseFetcher(self.url, self.dest).fetch()
+        fetcher.checkout()
+
+        self.assertTrue(os.path.exists(os.path.join(self.dest, 'pom.xml')))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, 'core', 'pom.xml')))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, 'ui')))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, 'docs')))
+
+    def test_non_utf8_file_names(self):
+        name = os.fsdecode(b'docs/caf\xe9.md')
+        url = make_bare_repo(os.path.join(self.tmp.name, 'latin1'), {'pom.xml': '<project/>', name: 'Caf\u00e9'})
+        fetcher = sf.SparseFetcher(url, os.path.join(self.tmp.name, 'latin1-clone')).fetch()
+
+        self.assertTrue(fetcher.exists(name))
+        self.assertEqual(fetcher.read(name), 'Caf\u00e9'.encode())
+
+    def test_unknown_repository_raises(self):
+        with self.assertRaises(ValueError) as ctx:
+            sf.SparseFetcher(Path(self.tmp.name, 'missing.git').as_uri(), self.dest).fetch()
+        self.assertIn('git clone failed', str(ctx.exception))
+
+    def test_stalled_git_times_out(self):
+        with mock.patch('subprocess.run', side_effect=subprocess.TimeoutExpired(['git'], 300)):
+            with self.assertRaises(ValueError) as ctx:
+                sf.SparseFetcher('https://github.com/owner/repo.git', self.dest).fetch()
+        self.assertIn('git clone timed out after 300s', str(ctx.exception))
+
+
+class DetectBuildSystemTests(unittest.TestCase):
+    def fetcher(self, *paths):
+        fetcher = sf.SparseFetcher('unused', 'unused')
+        fetcher.paths = set(paths)
+        return fetcher
+
+    def test_gradle_with_wrapper(self):
+        self.assertEqual(sf.detect_build_system(self.fetcher('build.gradle', 'gradlew')), 'Gradle')
+
+    def test_gradle_without_wrapper_is_rejected(self):
+        with self.assertRaises(ValueError) as ctx:
+            sf.detect_build_system(self.fetcher('build.gradle.kts'))
+        self.assertIn('Gradle wrapper (gradlew) not found', str(ctx.exception))
+
+    def test_no_build_system(self):
+        with self.assertRaises(ValueError) as ctx:
+            sf.detect_build_system(self.fetcher('core/pom.xml'))
+        self.assertIn('No build system found', str(ctx.exception))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+"""
+Tests for stream_tarball.py
+Run with: python stream_tarball_test.py
+
+Tarballs are built in memory and served from a local HTTP server standing in
+for the GitHub API, so the tests need no network.
+"""
+
+import io
+import sys
+import tarfile
+import threading
+import unittest
+from pathlib import Path
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import stream_tarball as st
+from fakes import LocalServer, QuietHandler
+
+
+def build_tarball(files, prefix='owner-repo-abc123'):
+    """Build a gzipped tarball the way GitHub lays it out (single top-level directory)."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        directory = tarfile.TarInfo(prefix)
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for path, content in files.items():
+            info = tarfile.TarInfo(f'{prefix}/{path}')
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class FakeGitHub(LocalServer):
+    """Serve tarballs for /repos/<owner>/<repo>/tarball/<ref> from a local HTTP server."""
+
+    def __init__(self, tarballs):
+        class Handler(QuietHandler):
+            def do_GET(self):
+                body = tarballs.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        super().__init__(Handler)
+
+
+class RecordingInspector:
+    """Records every member offered and every byte received."""
+
+    def __init__(self, wanted):
+        self.wanted = wanted
+        self.offered = []
+        self.received = {}
+        self._current = None
+
+    def start(self, path, size):
+        self.offered.append(path)
+        if path in self.wanted:
+            self._current = path
+            self.received[path] = b''
+            return True
+        return False
+
+    def update(self, chunk):
+        self.received[self._current] += chunk
+        return True
+
+    def result(self):
+        return self.received
+
+
+class BuildFileInspectorTests(unittest.TestCase):
+    def feed(self, *paths):
+        inspector = st.BuildFileInspector()
+        for path in paths:
+            inspector.start(path, 1)
+        return inspector
+
+    def test_maven(self):
+        self.assertEqual(self.feed('pom.xml', 'src/Main.java').result(), 'Maven')
+
+    def test_gradle_with_wrapper(self):
+        self.assertEqual(self.feed('build.gradle.kts', 'gradlew').result(), 'Gradle')
+
+    def test_gradle_without_wrapper_is_rejected(self):
+        with self.assertRaises(ValueError) as ctx:
+            self.feed('build.gradle').result()
+        self.assertIn('Gradle wrapper (gradlew) not found', str(ctx.exception))
+
+    def test_nested_build_files_are_ignored(self):
+        with self.assertRaises(ValueError) as ctx:
+            self.feed('module/pom.xml').result()
+        self.assertIn('No build system found', str(ctx.exception))
+
+
+class InspectStreamTests(unittest.TestCase):
+    def test_languages_counted_by_extension(self):
+        tarball = build_tarball({
+            'src/A.java': b'x' * 100,
+            'src/B.kt': b'x' * 40,
+            'scripts/tool.py': b'x' * 10,
+            'README.md': b'x' * 1000,
+        })
+        languages = st.LanguageInspector()
+        st.inspect_stream(io.BytesIO(tarball), [languages])
+        self.assertEqual(languages.result(), {'Java': 100, 'Kotlin': 40, 'Python': 10})
+
+    def test_binaries_detected_by_extension_and_content(self):
+        tarball = build_tarball({
+            'lib/dep.jar': b'PK\x03\x04',
+            'data/blob.dat': b'abc\x00def',
+            'src/A.java': b'class A {}',
+        })
+        binaries = st.BinaryInspector()
+        st.inspect_stream(io.BytesIO(tarball), [binaries])
+        self.assertEqual(binaries.result(), ['lib/dep.jar', 'data/blob.dat'])
+
+    def test_only_interested_inspectors_receive_content(self):
+        tarball = build_tarball({
+            'pom.xml': b'<project/>',
+            'src/A.java': b'class A {}',
+        })
+        wants_pom = RecordingInspector({'pom.xml'})
+        wants_nothing = RecordingInspector(set())
+        st.inspect_stream(io.BytesIO(tarball), [wants_pom, wants_nothing])
+
+        self.assertEqual(wants_pom.result(), {'pom.xml': b'<project/>'})
+        self.assertEqual(wants_nothing.offered, ['pom.xml', 'src/A.java'])
+        self.assertEqual(wants_nothing.result(), {})
+
+    def test_large_member_streamed_in_chunks(self):
+        content = b'a' * (st.CHUNK_SIZE * 3 + 5)
+        tarball = build_tarball({'big.txt': content})
+        recorder = RecordingInspector({'big.txt'})
+        st.inspect_stream(io.BytesIO(tarball), [recorder])
+        self.assertEqual(recorder.result()['big.txt'], content)
+
+
+class InspectTarballTests(unittest.TestCase):
+    def test_fetches_ref_from_api(self):
+        tarball = build_tarball({'pom.xml': b'<project/>', 'src/A.java': b'class A {}'})
+        with FakeGitHub({'/repos/owner/repo/tarball/main': tarball}) as github:
+            build, languages, binaries = st.inspect_tarball(
+                'owner', 'repo', 'main', st.default_inspectors(), api_url=github.url
+            )
+        self.assertEqual(build.result(), 'Maven')
+        self.assertEqual(languages.result(), {'Java': 10})
+        self.assertEqual(binaries.result(), [])
+
+    def test_missing_ref_raises(self):
+        with FakeGitHub({}) as github:
+            with self.assertRaises(ValueError) as ctx:
+                st.inspect_tarball('owner', 'repo', 'nope', st.default_inspectors(), api_url=github.url)
+        self.assertIn('not found: owner/repo@nope', str(ctx.exception))
+
+    def test_corrupt_archive_raises(self):
+        with FakeGitHub({'/repos/owner/repo/tarball/main': b'not a tarball'}) as github:
+            with self.assertRaises(ValueError) as ctx:
+                st.inspect_tarball('owner', 'repo', 'main', st.default_inspectors(), api_url=github.url)
+        self.assertIn('Could not read repository archive', str(ctx.exception))
+
+    def test_stalled_download_times_out(self):
+        release = threading.Event()
+
+        class Handler(QuietHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Length', '1000')
+                self.end_headers()
+                release.wait(5)
+
+        with LocalServer(Handler) as github:
+            try:
+                with self.assertRaises(ValueError) as ctx:
+                    st.inspect_tarball('owner', 'repo', 'main', st.default_inspectors(),
+                                       api_url=github.url, timeout=0.1)
+            finally:
+                release.set()
+        self.assertIn('GitHub API request failed', str(ctx.exception))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -47,6 +47,22 @@ tests = [
         'expect_success': True,
         'expected_output': 'normalized_url=https://github.com/PortSwigger/turbo-intruder'
     },
+    {
+        'name': 'Differently cased URL resolves to the canonical URL',
+        'env': {
+            'URL': 'https://github.com/portswigger/TURBO-INTRUDER'
+        },
+        'expect_success': True,
+        'expected_output': 'normalized_url=https://github.com/PortSwigger/turbo-intruder'
+    },
+    {
+        'name': 'Repository ID is output',
+        'env': {
+            'URL': 'https://github.com/PortSwigger/turbo-intruder'
+        },
+        'expect_success': True,
+        'expected_output': 'repo_id='
+    },
     {
         'name': 'Repository is a fork (hackvertor)',
         'env': {
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+"""
+Tests for zoom_digest.py
+Run with: python zoom_digest_test.py
+
+Notifications are posted to a local HTTP server standing in for the Zoom
+webhook, so the tests need no network.
+"""
+
+import base64
+import json
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+# Make the script under test importable (it lives one directory up).
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import zoom_digest as zd
+from fakes import FakeClock, LocalServer, QuietHandler
+
+
+def encode(payload):
+    return base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+SUBMISSION = {'Extension': 'Widget', 'Issue': 'https://github.com/PortSwigger/extension-portal/issues/1',
+              'Jira Ticket': 'BAPP-1'}
+UPDATE = {'Extension': 'Gadget', 'Version': '1.2', 'Update Ticket': 'BAPP-2'}
+ARCHIVED_REOPEN = {'Alert': 'Archived Issue Reopen Request', 'Issue': '#3: Thing',
+                   'Action Required': 'Manually restore issue to project board, then reopen'}
+
+
+class FakeWebhook(LocalServer):
+    """Record webhook posts on a local HTTP server, failing the first `failures` of them."""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.received = []
+        hook = self
+
+        class Handler(QuietHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                hook.received.append((self.path, self.headers['Authorization'], json.loads(body)))
+                status = hook.failures.pop(0) if hook.failures else 200
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        super().__init__(Handler)
+        self.url += '/webhook'
+
+    def payloads(self):
+        return [payload for _, _, payload in self.received]
+
+
+class BuildDigestTests(unittest.TestCase):
+    def test_single_payload_unchanged(self):
+        self.assertEqual(zd.build_digest([SUBMISSION]), SUBMISSION)
+
+    def test_fields_numbered_by_notification(self):
+        digest = zd.build_digest([SUBMISSION, UPDATE])
+        self.assertEqual(list(digest)[:3], ['Digest', '#1 Extension', '#1 Issue'])
+        self.assertEqual(digest['Digest'], '2 portal notifications')
+        self.assertEqual(digest['#2 Version'], '1.2')
+
+    def test_urgency(self):
+        self.assertTrue(zd.is_urgent(ARCHIVED_REOPEN))
+        self.assertFalse(zd.is_urgent(SUBMISSION))
+
+    def test_invalid_payload(self):
+        with self.assertRaises(ValueError):
+            zd.decode_payload('not base64 json')
+
+
+class SendTests(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        stderr = mock.patch('sys.stderr', new=StringIO())
+        stderr.start()
+        self.addCleanup(stderr.stop)
+
+    def test_posts_fields_with_verification_token(self):
+        with FakeWebhook() as hook:
+            zd.send(SUBMISSION, hook.url, 'secret', sleep=self.sleeps.append)
+        self.assertEqual(hook.received, [('/webhook?format=fields', 'secret', SUBMISSION)])
+
+    def test_retries_transient_failures_with_backoff(self):
+        with FakeWebhook(failures=[503, 429]) as hook:
+            zd.send(SUBMISSION, hook.url, 'secret', sleep=self.sleeps.append)
+        self.assertEqual(len(hook.received), 3)
+        self.assertEqual(self.sleeps, [zd.INITIAL_BACKOFF, zd.INITIAL_BACKOFF * 2])
+
+    def test_gives_up_after_max_attempts(self):
+        with FakeWebhook(failures=[500] * zd.MAX_ATTEMPTS) as hook:
+            with self.assertRaises(ValueError) as ctx:
+                zd.send(SUBMISSION, hook.url, 'secret', sleep=self.sleeps.append)
+        self.assertIn(f'after {zd.MAX_ATTEMPTS} attempts', str(ctx.exception))
+        self.assertEqual(len(hook.received), zd.MAX_ATTEMPTS)
+
+    def test_client_error_is_not_retried(self):
+        with FakeWebhook(failures=[401]) as hook:
+            with self.assertRaises(ValueError):
+                zd.send(SUBMISSION, hook.url, 'wrong', sleep=self.sleeps.append)
+        self.assertEqual(len(hook.received), 1)
+
+
+class DigestNotifierTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def notifier(self, url):
+        return zd.DigestNotifier(url, 'secret', window=30, clock=self.clock, sleep=lambda s: None)
+
+    def test_burst_within_window_sent_as_one_digest(self):
+        with FakeWebhook() as hook:
+            notifier = self.notifier(hook.url)
+            notifier.add(encode(SUBMISSION))
+            self.clock.now = 10
+            notifier.add(encode(UPDATE))
+            notifier.poll()
+            self.assertEqual(hook.received, [])
+
+            self.clock.now = 30
+            notifier.poll()
+        self.assertEqual(hook.payloads(), [zd.build_digest([SUBMISSION, UPDATE])])
+        self.assertFalse(notifier.queue)
+
+    def test_window_restarts_after_flush(self):
+        with FakeWebhook() as hook:
+            notifier = self.notifier(hook.url)
+            notifier.add(encode(SUBMISSION))
+            self.clock.now = 40
+            notifier.poll()
+            notifier.add(encode(UPDATE))
+            self.clock.now = 60
+            notifier.poll()
+            self.assertEqual(len(hook.received), 1)
+            self.clock.now = 70
+            notifier.poll()
+        self.assertEqual(hook.payloads(), [SUBMISSION, UPDATE])
+
+    def test_urgent_alert_bypasses_queue(self):
+        with FakeWebhook() as hook:
+            notifier = self.notifier(hook.url)
+            notifier.add(encode(SUBMISSION))
+            notifier.add(encode(ARCHIVED_REOPEN))
+            self.assertEqual(hook.payloads(), [ARCHIVED_REOPEN])
+            notifier.flush()
+        self.assertEqual(hook.payloads(), [ARCHIVED_REOPEN, SUBMISSION])
+
+    def test_flush_with_empty_queue_sends_nothing(self):
+        with FakeWebhook() as hook:
+            self.notifier(hook.url).flush()
+        self.assertEqual(hook.received, [])
+
+    def test_failed_flush_keeps_queue(self):
+        with FakeWebhook(failures=[403]) as hook:
+            notifier = self.notifier(hook.url)
+            notifier.add(encode(SUBMISSION))
+            with self.assertRaises(ValueError):
+                notifier.flush()
+            self.assertEqual(notifier.queue, [SUBMISSION])
+            notifier.flush()
+        self.assertEqual(hook.payloads(), [SUBMISSION, SUBMISSION])
+
+    def test_queue_persists_between_notifiers(self):
+        path = os.path.join(self.tmp, 'cache', 'queue.json')
+        with FakeWebhook() as hook:
+            first = zd.DigestNotifier(hook.url, 'secret', window=30, path=path, clock=self.clock)
+            first.add(encode(SUBMISSION))
+            first.save()
+
+            self.clock.now = 10
+            second = zd.DigestNotifier(hook.url, 'secret', window=30, path=path, clock=self.clock)
+            second.add(encode(UPDATE))
+            second.poll()
+            self.assertEqual(hook.received, [])
+
+            # The window runs from the first run's payload, not the second's.
+            self.clock.now = 30
+            second.poll()
+        self.assertEqual(hook.payloads(), [zd.build_digest([SUBMISSION, UPDATE])])
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def run_main(self, hook, **env):
+        env = {'ZOOM_WEBHOOK_URL': hook.url, 'ZOOM_VERIFICATION_TOKEN': 'secret', **env}
+        with mock.patch.dict('os.environ', env, clear=True), \
+                mock.patch('sys.stdout', new=StringIO()), \
+                mock.patch('sys.stderr', new=StringIO()) as stderr:
+            zd.main()
+        return stderr.getvalue()
+
+    def test_without_queue_file_sends_urgent_then_digest(self):
+        with FakeWebhook() as hook:
+            self.run_main(hook, PAYLOADS=f'{encode(SUBMISSION)}\n{encode(ARCHIVED_REOPEN)}\n{encode(UPDATE)}')
+        self.assertEqual(hook.payloads(), [ARCHIVED_REOPEN, zd.build_digest([SUBMISSION, UPDATE])])
+
+    def test_queue_file_coalesces_across_runs(self):
+        queue_file = os.path.join(self.tmp, 'zoom-queue.json')
+        with FakeWebhook() as hook:
+            self.run_main(hook, PAYLOADS=encode(SUBMISSION), QUEUE_FILE=queue_file)
+            self.run_main(hook, PAYLOADS=encode(UPDATE), QUEUE_FILE=queue_file)
+            self.assertEqual(hook.received, [])
+
+            # A scheduled run with no payloads drains the queue once the window has passed.
+            self.run_main(hook, QUEUE_FILE=queue_file, WINDOW='0')
+        self.assertEqual(hook.payloads(), [zd.build_digest([SUBMISSION, UPDATE])])
+        with open(queue_file) as f:
+            self.assertEqual(json.load(f)['queue'], [])
+
+    def test_flush_mode_sends_queued_notifications(self):
+        queue_file = os.path.join(self.tmp, 'zoom-queue.json')
+        with FakeWebhook() as hook:
+            self.run_main(hook, PAYLOADS=encode(SUBMISSION), QUEUE_FILE=queue_file)
+            self.run_main(hook, QUEUE_FILE=queue_file, MODE='flush')
+        self.assertEqual(hook.payloads(), [SUBMISSION])
+
+    def test_failed_urgent_alert_still_sends_digest(self):
+        with FakeWebhook(failures=[403]) as hook:
+            stderr = self.run_main(hook, PAYLOADS=f'{encode(ARCHIVED_REOPEN)}\n{encode(SUBMISSION)}')
+        self.assertIn('::warning::Zoom notification failed', stderr)
+        self.assertEqual(hook.payloads(), [ARCHIVED_REOPEN, SUBMISSION])
+
+    def test_failed_digest_stays_queued(self):
+        queue_file = os.path.join(self.tmp, 'zoom-queue.json')
+        with FakeWebhook(failures=[403]) as hook:
+            stderr = self.run_main(hook, PAYLOADS=encode(SUBMISSION), QUEUE_FILE=queue_file, MODE='flush')
+        self.assertIn('::warning::Zoom notification failed', stderr)
+        with open(queue_file) as f:
+            self.assertEqual(json.load(f)['queue'], [SUBMISSION])
+
+    @mock.patch.dict('os.environ', {}, clear=True)
+    def test_missing_configuration(self):
+        with self.assertRaises(SystemExit) as cm:
+            with mock.patch('sys.stderr', new=StringIO()):
+                zd.main()
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -6,34 +6,25 @@ Validates GitHub repository - checks if it exists and is not a fork
 
 import sys
 import os
-import re
 import json
 from urllib import request, error
-from github_actions_utils import set_output
-
-def extract_owner_repo(url):
-    """Extract owner and repo from GitHub URL"""
-    match = re.match(r'(?:https://)?(?:www\.)?github\.com/([^/]+)/([^/]+)', url)
-    if not match:
-        raise ValueError(f"Could not extract owner/repo from URL: {url}")
-
-    owner = match.group(1)
-    repo = match.group(2).rstrip('/')
-    return owner, repo
+import hedged_request
+from github_actions_utils import profiled, set_output
+from github_ref import extract_owner_repo
+from repo_identity import RepoIdentity
 
 def validate_repo(owner, repo, github_token=None):
     """
     Validate that the repository exists and is not a fork.
 
     Returns:
-        str: The normalized GitHub URL (https://github.com/owner/repo)
+        RepoIdentity: The repository's numeric ID, current full name and
+            canonical html_url, which follow any rename or transfer
 
     Raises:
         ValueError: If the repository is invalid, doesn't exist, or is a fork
     """
     try:
-        normalized_url = f"https://github.com/{owner}/{repo}"
-
         # Make GitHub API request
         api_url = f"https://api.github.com/repos/{owner}/{repo}"
         req = request.Request(api_url)
@@ -41,24 +32,24 @@ def validate_repo(owner, repo, github_token=None):
             req.add_header('Authorization', f'token {github_token}')
         req.add_header('Accept', 'application/vnd.github.v3+json')
 
-        with request.urlopen(req) as response:
-            data = json.loads(response.read().decode())
+        data = json.loads(hedged_request.fetch(req).decode())
 
-            if data.get('fork'):
-                raise ValueError(
-                    f"Repository {owner}/{repo} is a fork. "
-                    f"Extensions must be original work, not derivatives of other repositories. "
-                    f"Please submit the original repository instead."
-                )
+        if data.get('fork'):
+            raise ValueError(
+                f"Repository {owner}/{repo} is a fork. "
+                f"Extensions must be original work, not derivatives of other repositories. "
+                f"Please submit the original repository instead."
+            )
 
-        return normalized_url
+        return RepoIdentity(data['id'], data['full_name'], data['html_url'])
 
     except error.HTTPError as e:
         if e.code == 404:
             raise ValueError(f"GitHub repository not found: {owner}/{repo}")
         raise ValueError(f"GitHub API error: {e.code} {e.reason}")
 
-if __name__ == '__main__':
+def main():
+    """Main entry point for GitHub Actions workflow."""
     url = os.environ.get('URL')
     github_token = os.environ.get('GITHUB_TOKEN')  # Optional
 
@@ -70,12 +61,17 @@ if __name__ == '__main__':
 
     try:
         owner, repo = extract_owner_repo(url)
-        normalized_url = validate_repo(owner, repo, github_token)
+        identity = validate_repo(owner, repo, github_token)
+        owner, repo = identity.full_name.split('/')
         set_output('owner', owner)
         set_output('repo', repo)
-        set_output('normalized_url', normalized_url)
+        set_output('normalized_url', identity.html_url)
+        set_output('repo_id', identity.id)
     except Exception as e:
         error_msg = str(e)
         print(f'::error::{error_msg}', file=sys.stderr)
         set_output('error_message', error_msg)
         sys.exit(1)
+
+if __name__ == '__main__':
+    profiled(hedged_request.reporting(main))()
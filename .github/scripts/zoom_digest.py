@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+"""
+Sends Zoom notifications, coalescing bursts into a single digest.
+
+Each prepare_zoom step produces a base64-encoded JSON payload of fields.
+Rather than posting every payload on its own, payloads are queued and those
+arriving within a configurable window are merged into one digest message.
+Urgent alerts, such as archived issue reopen requests, bypass the queue and
+are sent immediately. Webhook requests are retried with exponential backoff.
+
+Bursts span several workflow runs, so the queue is kept in QUEUE_FILE between
+runs (restored and saved by the calling workflow, e.g. with actions/cache).
+Each run queues its payloads and sends the digest once the oldest queued
+payload has waited WINDOW seconds; a scheduled run with no payloads drains
+the queue when nothing else arrives. Without QUEUE_FILE nothing can outlive
+the run, so everything is sent before it exits.
+"""
+
+import base64
+import json
+import os
+import sys
+import time
+from urllib import request, error
+
+from github_actions_utils import profiled
+
+
+# Payload fields that mark a notification as needing immediate attention.
+URGENT_FIELDS = ('Alert', 'Action Required')
+
+DEFAULT_WINDOW = 60
+
+DEFAULT_QUEUE_PATH = '.portal-cache/zoom-queue.json'
+
+MAX_ATTEMPTS = 4
+
+# Seconds before the first retry; doubled for each further attempt.
+INITIAL_BACKOFF = 1.0
+
+# Seconds to wait for the webhook before treating an attempt as failed.
+SEND_TIMEOUT = 30
+
+
+def decode_payload(encoded):
+    """Decode a base64-encoded JSON payload produced by a prepare_zoom step."""
+    try:
+        return json.loads(base64.b64decode(encoded).decode('utf-8'))
+    except ValueError as e:
+        raise ValueError(f"Invalid Zoom payload: {e}")
+
+
+def is_urgent(payload):
+    """Return whether a payload must be sent immediately rather than queued."""
+    return any(field in payload for field in URGENT_FIELDS)
+
+
+def build_digest(payloads):
+    """
+    Merge several payloads into a single message of fields.
+
+    A single payload is returned unchanged. Otherwise each field is prefixed
+    with the number of the notification it came from, preserving order.
+    """
+    if len(payloads) == 1:
+        return payloads[0]
+
+    digest = {'Digest': f'{len(payloads)} portal notifications'}
+    for number, payload in enumerate(payloads, start=1):
+        for field, value in payload.items():
+            digest[f'#{number} {field}'] = value
+    return digest
+
+
+def send(payload, webhook_url, verification_token, sleep=time.sleep, timeout=SEND_TIMEOUT):
+    """
+    Post a payload to the Zoom incoming webhook, retrying transient failures.
+
+    Raises:
+        ValueError: If the webhook rejects the payload or every attempt fails
+    """
+    req = request.Request(
+        f'{webhook_url}?format=fields',
+        method='POST',
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json', 'Authorization': verification_token},
+    )
+
+    backoff = INITIAL_BACKOFF
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with request.urlopen(req, timeout=timeout) as response:
+                response.read()
+            return
+        except error.HTTPError as e:
+            if e.code != 429 and e.code < 500:
+                raise ValueError(f"Zoom webhook error: {e.code} {e.reason}")
+            reason = f"{e.code} {e.reason}"
+        except OSError as e:
+            reason = str(getattr(e, 'reason', e))
+
+        if attempt < MAX_ATTEMPTS:
+            print(f'::warning::Zoom webhook attempt {attempt} failed ({reason}); retrying', file=sys.stderr)
+            sleep(backoff)
+            backoff *= 2
+
+    raise ValueError(f"Zoom webhook failed after {MAX_ATTEMPTS} attempts: {reason}")
+
+
+class DigestNotifier:
+    """
+    Queues notifications and sends those arriving within a window as one digest.
+
+    Example:
+        notifier = DigestNotifier(webhook_url, token, window=60)
+        notifier.add(encoded_payload)
+        ...
+        notifier.poll()   # sends a digest once the window has elapsed
+        notifier.flush()  # sends whatever is left
+
+    With a path, the queue is loaded from that file and save() writes it
+    back, so a burst can be coalesced across processes.
+    """
+
+    def __init__(self, webhook_url, verification_token, window=DEFAULT_WINDOW, path=None,
+                 clock=time.time, sleep=time.sleep):
+        self.webhook_url = webhook_url
+        self.verification_token = verification_token
+        self.window = window
+        self.path = path
+        self.clock = clock
+        self.sleep = sleep
+        self.queue = []
+        self.sent = 0
+        self._window_start = None
+        if path:
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                self.queue = data.get('queue', [])
+                self._window_start = data.get('window_start')
+            except FileNotFoundError:
+                pass
+            except ValueError:
+                print(f'::warning::Ignoring unreadable Zoom queue {path}', file=sys.stderr)
+
+    def add(self, encoded):
+        """Queue a base64-encoded payload, or send it immediately if it is urgent."""
+        payload = decode_payload(encoded)
+        if is_urgent(payload):
+            self._send(payload)
+            return
+        if not self.queue:
+            self._window_start = self.clock()
+        self.queue.append(payload)
+
+    def due(self):
+        """Return whether the oldest queued notification has waited a full window."""
+        return bool(self.queue) and self.clock() - self._window_start >= self.window
+
+    def poll(self):
+        """Send the queued notifications as a digest if the window has elapsed."""
+        if self.due():
+            self.flush()
+
+    def flush(self):
+        """Send every queued notification now, as a single digest; on failure they stay queued."""
+        if not self.queue:
+            return
+        self._send(build_digest(self.queue))
+        self.queue = []
+        self._window_start = None
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({'window_start': self._window_start, 'queue': self.queue}, f)
+
+    def _send(self, payload):
+        send(payload, self.webhook_url, self.verification_token, self.sleep)
+        self.sent += 1
+
+
+def main():
+    """Main entry point for GitHub Actions workflow."""
+    webhook_url = os.environ.get('ZOOM_WEBHOOK_URL')
+    verification_token = os.environ.get('ZOOM_VERIFICATION_TOKEN')
+    payloads = (os.environ.get('PAYLOADS') or '').split()
+    queue_file = os.environ.get('QUEUE_FILE')
+    mode = os.environ.get('MODE') or 'queue'
+
+    if not webhook_url or not verification_token or mode not in ('queue', 'flush'):
+        print('::error::ZOOM_WEBHOOK_URL and ZOOM_VERIFICATION_TOKEN environment variables are required, '
+              'and MODE must be queue or flush', file=sys.stderr)
+        sys.exit(1)
+
+    # As in the single-message workflow, a failed notification is a warning,
+    # not a job failure. Each payload is handled on its own so that one
+    # failed urgent alert cannot drop the rest.
+    try:
+        notifier = DigestNotifier(
+            webhook_url,
+            verification_token,
+            window=float(os.environ.get('WINDOW') or DEFAULT_WINDOW),
+            path=queue_file,
+        )
+    except Exception as e:
+        print(f'::warning::Zoom notification failed: {e}', file=sys.stderr)
+        return
+
+    for encoded in payloads:
+        try:
+            notifier.add(encoded)
+        except Exception as e:
+            print(f'::warning::Zoom notification failed: {e}', file=sys.stderr)
+
+    try:
+        if mode == 'flush' or not queue_file:
+            notifier.flush()
+        else:
+            notifier.poll()
+    except Exception as e:
+        print(f'::warning::Zoom notification failed: {e}', file=sys.stderr)
+
+    try:
+        notifier.save()
+    except OSError as e:
+        print(f'::warning::Could not save Zoom queue {queue_file}: {e}', file=sys.stderr)
+    print(f'Sent {notifier.sent} message(s) to Zoom; {len(notifier.queue)} notification(s) queued')
+
+
+if __name__ == '__main__':
+    profiled(main)()